@@ -32,7 +32,8 @@ class SearchAgent:
             - Solutions and their properties
             - Products and their attributes
             - Models and simulations
-            Input should be a natural language query.
+            Input should be a natural language query. Several related questions can be
+            asked in one call by separating them with ';'.
             """
         )
         return [semantic_tool]
@@ -0,0 +1,72 @@
+# benchmarks/bench_bulk_upload.py
+"""
+Upload throughput of data/bev.cypher with AdvancedNeo4jBatchUploader: the
+statement-per-round-trip path (upload_cypher_script) against the UNWIND bulk
+loader (upload_cypher_script_bulk), in statements per second.
+
+bev.cypher starts by deleting every node, so each run replaces the whole graph of
+the configured database with the BEV model, exactly like running
+data/upload_to_neo4j.py. Recreate the embeddings afterwards.
+"""
+import os
+import sys
+import time
+import statistics
+
+from dotenv import load_dotenv
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+load_dotenv()
+from data.upload_to_neo4j import AdvancedNeo4jBatchUploader
+from utils.utils import load_config
+
+config = load_config()
+neo4j_config = config.get("neo4j", {})
+uri = neo4j_config.get("uri", "")
+username = neo4j_config.get("username", "")
+password = os.getenv("NEO4J_ADMIN")
+
+CYPHER_FILE = os.path.join(PROJECT_ROOT, "data", "bev.cypher")
+REPEATS = 3
+
+
+def measure(upload, cypher_script):
+    durations = []
+    statements = 0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        results = upload(cypher_script, create_backup=False)
+        durations.append(time.perf_counter() - start)
+        statements = results['success'] + results['failed']
+        if results['failed']:
+            print(f"  warning: {results['failed']} statements failed")
+    return statements, statistics.median(durations)
+
+
+def main():
+    with open(CYPHER_FILE, "r", encoding="utf-8") as file:
+        cypher_script = file.read()
+
+    uploader = AdvancedNeo4jBatchUploader(uri, username, password)
+    try:
+        rows = []
+        for title, upload in (("per statement (before)", uploader.upload_cypher_script),
+                              ("UNWIND bulk (after)", uploader.upload_cypher_script_bulk)):
+            statements, duration = measure(upload, cypher_script)
+            rows.append((title, statements, duration))
+    finally:
+        uploader.close()
+
+    print(f"\n{'upload path':>24} | {'statements':>10} | {'time':>8} | {'stmt/s':>9}")
+    print("-" * 62)
+    for title, statements, duration in rows:
+        print(f"{title:>24} | {statements:>10} | {duration:>7.2f}s | {statements / duration:>9.1f}")
+    print(f"\nSpeedup: {rows[0][2] / rows[1][2]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_cold_start.py
+"""
+Cold-start time of the chatbot: importing multi_agent_system (what chatbot.py
+imports before it can render anything) in a fresh interpreter, with the embedding
+model loaded eagerly at import time (the previous behaviour of models/embedding.py)
+versus lazily on first use. Also reports the time until the first query embedding
+is available, which the lazy path pays on the first search instead.
+"""
+import os
+import sys
+import json
+import subprocess
+import statistics
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+REPEATS = 3
+
+# Runs in a fresh interpreter so no module is already imported or cached
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from dotenv import load_dotenv
+load_dotenv()
+import multi_agent_system
+from models.embedding import get_embedding_model
+if sys.argv[1] == "eager":
+    get_embedding_model().model
+ready = time.perf_counter() - start
+get_embedding_model().encode("What are the inputs of the VehicleDynamicsModel?")
+first_embedding = time.perf_counter() - start
+print(json.dumps({"ready": ready, "first_embedding": first_embedding}))
+'''
+
+
+def probe(mode):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, mode],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    rows = []
+    for mode, title in (("eager", "eager load (before)"), ("lazy", "lazy load (after)")):
+        runs = [probe(mode) for _ in range(REPEATS)]
+        rows.append((
+            title,
+            statistics.median(run["ready"] for run in runs),
+            statistics.median(run["first_embedding"] for run in runs),
+        ))
+
+    print(f"{'startup':>22} | {'import ready':>12} | {'first embedding':>15}")
+    print("-" * 56)
+    for title, ready, first_embedding in rows:
+        print(f"{title:>22} | {ready:>11.2f}s | {first_embedding:>14.2f}s")
+    print(f"\nImport-time saving: {rows[0][1] - rows[1][1]:.2f}s "
+          f"(with embedding.warm_up the model loads in the background during that time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_cypher_chain_setup.py
+"""
+Per-query setup overhead of the Cypher QA chain: building the prompt, LLM client
+and GraphCypherQAChain on every call (the previous behaviour of
+semantic_cypher_search) versus fetching the shared chain from get_cypher_chain().
+Only setup is timed, no LLM or database query is issued by the chain itself.
+"""
+import os
+import sys
+import time
+import statistics
+
+from dotenv import load_dotenv
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+load_dotenv()
+from langchain_neo4j import GraphCypherQAChain, Neo4jGraph
+from langchain.prompts.prompt import PromptTemplate
+from models.llm import get_llm
+from tools.graph_search.cypher_generation_template import CYPHER_GENERATION_TEMPLATE
+from tools.graph_search.semantic_cypher import get_cypher_chain
+from utils.utils import load_config
+
+config = load_config()
+neo4j_agent_config = config.get("neo4j_agent", {})
+
+ITERATIONS = 20
+
+
+def per_query_setup():
+    """Setup as semantic_cypher_search did it before the chain was shared"""
+    cypher_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
+    llm = get_llm("searchagent")
+    graph = Neo4jGraph(
+        url=neo4j_agent_config.get("uri", ""),
+        username=neo4j_agent_config.get("username", ""),
+        password=os.getenv('NEO4J_AGENT'),
+        database=neo4j_agent_config.get("database", "")
+    )
+    chain = GraphCypherQAChain.from_llm(
+        llm,
+        graph=graph,
+        verbose=False,
+        cypher_prompt=cypher_prompt,
+        allow_dangerous_requests=True,
+        top_k=100,
+    )
+    graph.close()
+    return chain
+
+
+def measure(setup):
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        setup()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    # First call builds the shared chain; report it separately as the one-off cost
+    start = time.perf_counter()
+    get_cypher_chain()
+    first_build = (time.perf_counter() - start) * 1000
+
+    before_p50, before_max = measure(per_query_setup)
+    after_p50, after_max = measure(get_cypher_chain)
+
+    print(f"{'setup':>22} | {'p50':>10} | {'max':>10}")
+    print("-" * 48)
+    print(f"{'per query (before)':>22} | {before_p50:>8.2f}ms | {before_max:>8.2f}ms")
+    print(f"{'shared chain (after)':>22} | {after_p50:>8.2f}ms | {after_max:>8.2f}ms")
+    print(f"\nOne-off shared chain build: {first_build:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
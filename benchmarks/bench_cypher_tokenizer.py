@@ -0,0 +1,81 @@
+# benchmarks/bench_cypher_tokenizer.py
+"""
+Microbenchmark of iter_cypher_statements in data/upload_to_neo4j.py on
+data/bev.cypher and on a synthetic script of 100 copies of it. Each script is
+tokenized from a string read up front and streamed from the open file; reported
+are statements/sec, MB/s and the peak Python memory of a pass (tracemalloc).
+"""
+import os
+import sys
+import time
+import tempfile
+import statistics
+import tracemalloc
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from data.upload_to_neo4j import iter_cypher_statements
+
+CYPHER_FILE = os.path.join(PROJECT_ROOT, "data", "bev.cypher")
+SCALES = [(1, 5), (100, 3)]  # (copies of bev.cypher, timed repeats)
+
+
+def tokenize_string(path):
+    with open(path, "r", encoding="utf-8") as file:
+        script = file.read()
+    return sum(1 for _ in iter_cypher_statements(script))
+
+
+def tokenize_stream(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return sum(1 for _ in iter_cypher_statements(file))
+
+
+def measure(tokenize, path, repeats):
+    timings = []
+    statements = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        statements = tokenize(path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    tokenize(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statements, statistics.median(timings), peak
+
+
+def main():
+    with open(CYPHER_FILE, "r", encoding="utf-8") as file:
+        script = file.read()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for copies, repeats in SCALES:
+            path = CYPHER_FILE
+            if copies > 1:
+                path = os.path.join(directory, f"bev_x{copies}.cypher")
+                with open(path, "w", encoding="utf-8") as file:
+                    for _ in range(copies):
+                        file.write(script)
+                        file.write("\n")
+            size_mb = os.path.getsize(path) / 1e6
+
+            for title, tokenize in (("string", tokenize_string), ("stream", tokenize_stream)):
+                statements, duration, peak = measure(tokenize, path, repeats)
+                rows.append((f"bev.cypher x{copies}", title, size_mb, statements, duration, peak))
+
+    print(f"{'script':>16} | {'source':>6} | {'MB':>6} | {'statements':>10} | {'time':>8} | "
+          f"{'stmt/s':>9} | {'MB/s':>6} | {'peak mem':>9}")
+    print("-" * 92)
+    for script_name, title, size_mb, statements, duration, peak in rows:
+        print(f"{script_name:>16} | {title:>6} | {size_mb:>6.2f} | {statements:>10} | {duration:>7.3f}s | "
+              f"{statements / duration:>9.0f} | {size_mb / duration:>6.1f} | {peak / 1e6:>7.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/bench_embedding_backends.py
+"""
+Parity and throughput of the CPU embedding providers in models/embedding.py.
+
+Every backend embeds the node descriptions of data/bev.cypher and is compared to
+the float32 PyTorch model: per-text cosine similarity, and recall@5 of the
+descriptions retrieved for a set of search questions. A backend fails the parity
+check below MIN_COSINE / MIN_RECALL, and the script then exits with status 1.
+Throughput is reported as single-query latency (the search path) and batched
+texts per second (the create_embeddings path).
+"""
+import os
+import re
+import sys
+import time
+import statistics
+
+import numpy as np
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.embedding import load_embedding_model
+from utils.utils import load_config
+
+config = load_config()
+embedding_config = config.get("embedding", {})
+model_name = embedding_config.get("model", "all-MiniLM-L6-v2")
+batch_size = embedding_config.get("batch_size", 32)
+
+CYPHER_FILE = os.path.join(PROJECT_ROOT, "data", "bev.cypher")
+BACKENDS = [
+    ("sentence_transformers", None),
+    ("torch_int8", None),
+    ("onnx", None),
+    ("onnx", "onnx/model_qint8_avx2.onnx"),
+]
+QUESTIONS = [
+    "design requirements for components in the thermal management solution",
+    "Which functional requirements must the UserAuthentication function satisfy?",
+    "What are the inputs of the VehicleDynamicsModel?",
+    "Which performance requirements does the battery solution have to meet?",
+    "List all attributes of the BatteryPack product",
+    "charging power of the onboard charger",
+    "range of the vehicle on one battery charge",
+    "cooling of the electric motor",
+]
+MIN_COSINE = 0.98
+MIN_RECALL = 0.9
+RECALL_K = 5
+LATENCY_REPEATS = 50
+
+_DESCRIPTION_PATTERN = re.compile(r"description:\s*'((?:[^'\\]|\\.)*)'")
+
+
+def load_descriptions():
+    with open(CYPHER_FILE, "r", encoding="utf-8") as file:
+        return sorted(set(_DESCRIPTION_PATTERN.findall(file.read())))
+
+
+def recall_at_k(reference_corpus, reference_queries, corpus, queries):
+    hits = []
+    for i in range(len(queries)):
+        expected = set(np.argsort(-(reference_corpus @ reference_queries[i]))[:RECALL_K])
+        retrieved = set(np.argsort(-(corpus @ queries[i]))[:RECALL_K])
+        hits.append(len(expected & retrieved) / RECALL_K)
+    return statistics.mean(hits)
+
+
+def measure(model, texts):
+    # Warm up kernels before timing
+    model.encode(QUESTIONS, normalize_embeddings=True)
+
+    timings = []
+    for i in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        model.encode(QUESTIONS[i % len(QUESTIONS)], normalize_embeddings=True)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    corpus = model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    queries = model.encode(QUESTIONS, normalize_embeddings=True)
+    return np.asarray(corpus, dtype=np.float32), np.asarray(queries, dtype=np.float32), \
+        statistics.median(timings), throughput
+
+
+def main():
+    texts = load_descriptions()
+    print(f"Embedding {len(texts)} descriptions from {os.path.basename(CYPHER_FILE)} with {model_name}\n")
+
+    reference = None
+    rows = []
+    failed = False
+    for provider, onnx_file in BACKENDS:
+        title = f"{provider} ({os.path.basename(onnx_file)})" if onnx_file else provider
+        try:
+            model = load_embedding_model(provider, model_name, onnx_file)
+        except Exception as e:
+            # The float model is the reference, without it there is nothing to compare
+            if reference is None:
+                raise
+            print(f"Skipping {title}: {e}")
+            continue
+
+        corpus, queries, latency, throughput = measure(model, texts)
+        if reference is None:
+            reference = (corpus, queries)
+
+        cosines = np.sum(corpus * reference[0], axis=1)
+        recall = recall_at_k(reference[0], reference[1], corpus, queries)
+        passed = cosines.min() >= MIN_COSINE and recall >= MIN_RECALL
+        failed = failed or not passed
+        rows.append((title, float(cosines.min()), float(cosines.mean()), recall, latency, throughput, passed))
+
+    print(f"{'backend':<36} | {'min cos':>7} | {'mean cos':>8} | {'recall@5':>8} | {'query p50':>9} | {'texts/s':>8} | parity")
+    print("-" * 100)
+    for title, min_cosine, mean_cosine, recall, latency, throughput, passed in rows:
+        print(f"{title:<36} | {min_cosine:>7.4f} | {mean_cosine:>8.4f} | {recall:>8.2f} | "
+              f"{latency:>7.2f}ms | {throughput:>8.1f} | {'PASS' if passed else 'FAIL'}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
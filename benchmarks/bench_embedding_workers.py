@@ -0,0 +1,94 @@
+# benchmarks/bench_embedding_workers.py
+"""
+Encoding throughput of utils/create_embeddings.py by --workers: the in-process
+encoder (encode_serial) against process pools of 2 and 4 workers
+(encode_parallel), in nodes per second.
+
+The node descriptions of data/bev.cypher, repeated COPIES times, are fed through
+the same page and batch queues the reader and writer threads use, so no Neo4j
+database is needed. Worker start-up (spawning the process and loading the model)
+is part of the measured time, as it is for a real run.
+"""
+import os
+import re
+import sys
+import time
+import queue
+import threading
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.embedding import get_embedding_set
+from utils.create_embeddings import QUEUE_SIZE, _DONE, encode_serial, encode_parallel, page_size
+
+CYPHER_FILE = os.path.join(PROJECT_ROOT, "data", "bev.cypher")
+COPIES = 20
+WORKERS = [1, 2, 4]
+
+_NODE_PATTERN = re.compile(r"^CREATE \(\w*:\w+ \{(.*?)\}\)", re.M | re.S)
+_PROPERTY_PATTERN = re.compile(r"(\w+):\s*'((?:[^'\\]|\\.)*)'")
+
+
+def load_nodes():
+    with open(CYPHER_FILE, "r", encoding="utf-8") as file:
+        properties = [dict(_PROPERTY_PATTERN.findall(body)) for body in _NODE_PATTERN.findall(file.read())]
+    described = [node for node in properties if node.get("description")]
+    return [{"elementId": f"{copy}:{i}", "name": node.get("name"), "description": node["description"]}
+            for copy in range(COPIES) for i, node in enumerate(described)]
+
+
+def run(nodes, embedding_set, workers):
+    """Encode all nodes through the pipeline queues, returning (encoded, seconds)"""
+    pages = queue.Queue(maxsize=QUEUE_SIZE)
+    batches = queue.Queue(maxsize=QUEUE_SIZE)
+    errors = []
+
+    def feed():
+        for offset in range(0, len(nodes), page_size):
+            pages.put(nodes[offset:offset + page_size])
+        pages.put(_DONE)
+
+    def drain():
+        while batches.get() is not _DONE:
+            pass
+
+    # Started before the pool, like the reader and writer threads of a real run
+    feeder = threading.Thread(target=feed, daemon=True)
+    drainer = threading.Thread(target=drain, daemon=True)
+    start = time.perf_counter()
+    feeder.start()
+    drainer.start()
+    try:
+        if workers > 1:
+            encoded = encode_parallel(pages, batches, errors, embedding_set, workers)
+        else:
+            encoded = encode_serial(pages, batches, errors, embedding_set)
+    finally:
+        batches.put(_DONE)
+        drainer.join()
+    return encoded, time.perf_counter() - start
+
+
+def main():
+    nodes = load_nodes()
+    embedding_set = get_embedding_set()
+    print(f"Encoding {len(nodes)} nodes ({COPIES} copies of {os.path.basename(CYPHER_FILE)}) "
+          f"with {embedding_set['provider']} / {embedding_set['model']} on {os.cpu_count()} CPUs\n")
+
+    rows = []
+    for workers in WORKERS:
+        encoded, duration = run(nodes, embedding_set, workers)
+        rows.append((workers, encoded, duration))
+
+    print(f"\n{'workers':>7} | {'nodes':>6} | {'time':>8} | {'nodes/s':>8} | {'speedup':>7}")
+    print("-" * 50)
+    for workers, encoded, duration in rows:
+        print(f"{workers:>7} | {encoded:>6} | {duration:>7.2f}s | {encoded / duration:>8.1f} | "
+              f"{rows[0][2] / duration:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_local_index.py
+"""
+Query latency of the in-process vector index (tools/graph_search/local_index.py)
+on synthetic unit vectors, for the BEV graph size and for larger graphs that
+switch to the IVF structure, plus the startup time of building the index from
+rows versus mapping a stored matrix (embedding_store.py). No database connection
+is needed.
+"""
+import os
+import sys
+import time
+import tempfile
+import statistics
+
+import numpy as np
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from tools.graph_search.embedding_store import write_embedding_store, load_embedding_store
+from tools.graph_search.local_index import LocalVectorIndex
+from utils.utils import load_config
+
+config = load_config()
+dimension = config.get("embedding", {}).get("dimension", 384)
+rag_config = config.get("rag", {})
+local_index_config = config.get("local_index", {})
+
+GRAPH_SIZES = [1_100, 10_000, 100_000]
+QUERIES_PER_SIZE = 200
+
+
+def main():
+    rng = np.random.default_rng(42)
+    limit = rag_config.get("top_k", 20)
+
+    store_dir = tempfile.mkdtemp(prefix="bench_embedding_store_")
+
+    print(f"{'nodes':>8} | {'structure':>9} | {'build':>9} | {'mmap load':>9} | {'p50':>9} | {'p95':>9} | {'recall@k':>8}")
+    print("-" * 78)
+    for size in GRAPH_SIZES:
+        vectors = rng.standard_normal((size, dimension)).astype(np.float32)
+        index = LocalVectorIndex(
+            dimension,
+            ivf_threshold=local_index_config.get("ivf_threshold", 20000),
+            nprobe=local_index_config.get("nprobe", 8),
+        )
+
+        start = time.perf_counter()
+        index.upsert({"elementId": str(i), "name": str(i), "embedding": vectors[i]} for i in range(size))
+        build_seconds = time.perf_counter() - start
+
+        base_path = os.path.join(store_dir, f"bench_{size}")
+        rows = ({"elementId": str(i), "name": str(i), "embedding": vectors[i]} for i in range(size))
+        write_embedding_store(base_path, rows, size, {"version": None, "model": "bench", "dimension": dimension})
+        start = time.perf_counter()
+        LocalVectorIndex.from_store(
+            *load_embedding_store(base_path),
+            ivf_threshold=local_index_config.get("ivf_threshold", 20000),
+            nprobe=local_index_config.get("nprobe", 8),
+        )
+        load_seconds = time.perf_counter() - start
+
+        # Queries close to stored vectors, so the exact top-k is known-ish and recall is meaningful
+        targets = rng.choice(size, QUERIES_PER_SIZE, replace=False)
+        queries = vectors[targets] + 0.3 * rng.standard_normal((QUERIES_PER_SIZE, dimension)).astype(np.float32)
+
+        timings = []
+        hits = 0
+        for target, query in zip(targets, queries):
+            start = time.perf_counter()
+            results = index.search(query, limit=limit, threshold=0.0)
+            timings.append((time.perf_counter() - start) * 1000)
+            hits += any(result["name"] == str(target) for result in results)
+
+        p50 = statistics.median(timings)
+        p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+        structure = "ivf" if index.uses_ivf else "brute"
+        print(f"{size:>8} | {structure:>9} | {build_seconds:>8.2f}s | {load_seconds:>8.2f}s | "
+              f"{p50:>7.3f}ms | {p95:>7.3f}ms | {hits / QUERIES_PER_SIZE:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
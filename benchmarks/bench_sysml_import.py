@@ -0,0 +1,69 @@
+# benchmarks/bench_sysml_import.py
+"""
+Re-import time of the BEV model: data/bev.cypher through the UNWIND bulk path of
+data/upload_to_neo4j.py against data/import_sysml.py, which reads
+data/bev_sysml_model.sysml directly without generating or parsing Cypher.
+
+Both replace the BEV model in the configured database, like the importers
+themselves (bev.cypher the whole graph). Recreate the embeddings afterwards.
+"""
+import os
+import sys
+import time
+import statistics
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import neo4j
+from data.import_sysml import (parse_sysml, save_external_links, delete_model_graph, load_graph,
+                               restore_external_links, uri, auth)
+from data.upload_to_neo4j import AdvancedNeo4jBatchUploader
+
+CYPHER_FILE = os.path.join(PROJECT_ROOT, "data", "bev.cypher")
+SYSML_FILE = os.path.join(PROJECT_ROOT, "data", "bev_sysml_model.sysml")
+REPEATS = 3
+
+
+def import_cypher():
+    uploader = AdvancedNeo4jBatchUploader(uri, auth[0], auth[1])
+    try:
+        with open(CYPHER_FILE, "r", encoding="utf-8") as cypher_file:
+            uploader.upload_cypher_script_bulk(cypher_file, create_backup=False)
+    finally:
+        uploader.close()
+
+
+def import_sysml():
+    driver = neo4j.GraphDatabase.driver(uri, auth=auth)
+    try:
+        with open(SYSML_FILE, "r", encoding="utf-8") as sysml_file:
+            nodes, edges, _ = parse_sysml(sysml_file.read())
+        links = save_external_links(driver)
+        delete_model_graph(driver)
+        load_graph(driver, nodes, edges)
+        restore_external_links(driver, links, nodes)
+    finally:
+        driver.close()
+
+
+def main():
+    rows = []
+    for title, run in (("bev.cypher, UNWIND bulk", import_cypher), ("SysML direct", import_sysml)):
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        rows.append((title, statistics.median(timings), min(timings)))
+
+    print(f"\n{'re-import':>24} | {'median':>8} | {'best':>8}")
+    print("-" * 48)
+    for title, median, best in rows:
+        print(f"{title:>24} | {median:>7.2f}s | {best:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_template_retrieval.py
+"""
+Token count and Cypher-generation latency of the full prompt (all example queries)
+versus the retrieved prompt (top-k example queries from the template catalog),
+for a set of representative search agent questions.
+"""
+import os
+import sys
+import time
+import statistics
+
+from dotenv import load_dotenv
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+load_dotenv()
+from langchain.prompts.prompt import PromptTemplate
+from data.knowledgegraph import get_graph_schema
+from models.llm import get_llm
+from tools.graph_search.cypher_generation_template import CYPHER_GENERATION_TEMPLATE, CYPHER_RETRIEVAL_TEMPLATE
+from tools.graph_search.semantic_cypher import semantic_search, format_semantic_results
+from tools.graph_search.template_catalog import get_template_catalog, format_templates
+from utils.utils import load_config
+
+config = load_config()
+rag_config = config.get("rag", {})
+
+QUESTIONS = [
+    "design requirements for components in the thermal management solution",
+    "Which functional requirements must the UserAuthentication function satisfy?",
+    "What are the inputs of the VehicleDynamicsModel?",
+    "Which performance requirements does the battery solution have to meet?",
+    "List all attributes of the BatteryPack product",
+    "Which model outputs are equal to attributes of the ElectricMotor?",
+]
+REPEATS = 3
+
+
+def count_tokens(llm, text):
+    try:
+        return llm.get_num_tokens(text)
+    except Exception:
+        # Rough estimate when the provider cannot count tokens offline
+        return len(text) // 4
+
+
+def time_generation(llm, prompt):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        llm.invoke(prompt)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    llm = get_llm("searchagent")
+    schema = get_graph_schema()
+    catalog = get_template_catalog()
+    k = rag_config.get("template_top_k", 8)
+
+    full_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
+    retrieved_prompt = PromptTemplate.from_template(CYPHER_RETRIEVAL_TEMPLATE)
+
+    rows = []
+    for question in QUESTIONS:
+        semantic_results = format_semantic_results(semantic_search(question, limit=rag_config.get("top_k", 5)))
+
+        start = time.perf_counter()
+        templates = catalog.retrieve(question, k=k)
+        retrieval_ms = (time.perf_counter() - start) * 1000
+
+        full = full_prompt.format(query=question, semantic_results=semantic_results, schema=schema)
+        retrieved = retrieved_prompt.format(
+            query=question, semantic_results=semantic_results, schema=schema, templates=format_templates(templates)
+        )
+
+        rows.append((
+            question,
+            count_tokens(llm, full), count_tokens(llm, retrieved),
+            time_generation(llm, full), time_generation(llm, retrieved),
+            retrieval_ms,
+        ))
+
+    print(f"{'question':<48} | {'full tok':>8} | {'top-k tok':>9} | {'full s':>7} | {'top-k s':>7} | {'retr ms':>7}")
+    print("-" * 102)
+    for question, full_tokens, retrieved_tokens, full_s, retrieved_s, retrieval_ms in rows:
+        print(f"{question[:48]:<48} | {full_tokens:>8} | {retrieved_tokens:>9} | {full_s:>7.2f} | {retrieved_s:>7.2f} | {retrieval_ms:>7.2f}")
+
+    full_tokens = sum(row[1] for row in rows)
+    retrieved_tokens = sum(row[2] for row in rows)
+    print(f"\nPrompt tokens reduced by {100 * (1 - retrieved_tokens / full_tokens):.1f}% with k={k}")
+    print(f"Median generation latency: full {statistics.median(row[3] for row in rows):.2f}s, "
+          f"top-k {statistics.median(row[4] for row in rows):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
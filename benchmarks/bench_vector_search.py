@@ -0,0 +1,134 @@
+# benchmarks/bench_vector_search.py
+"""
+Compare full-scan cosine scoring against db.index.vector.queryNodes on synthetic
+graphs of 1k, 10k and 100k nodes. Uses a throw-away label and index that are
+removed again after each run, so it can be pointed at the development database.
+"""
+import os
+import sys
+import time
+import statistics
+
+import numpy as np
+from dotenv import load_dotenv
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+load_dotenv()
+import neo4j
+from utils.utils import load_config
+
+config = load_config()
+neo4j_config = config.get("neo4j", {})
+uri = neo4j_config.get("uri", "")
+auth = (neo4j_config.get("username", ""), os.getenv("NEO4J_ADMIN"))
+db_name = neo4j_config.get("database", "")
+dimension = config.get("embedding", {}).get("dimension", 384)
+rag_config = config.get("rag", {})
+
+BENCH_LABEL = "BenchVectorNode"
+BENCH_INDEX = "benchVectorIndex"
+GRAPH_SIZES = [1_000, 10_000, 100_000]
+QUERIES_PER_SIZE = 50
+WRITE_BATCH = 5_000
+
+SCAN_QUERY = f'''
+MATCH (n:{BENCH_LABEL})
+WITH n, vector.similarity.cosine(n.description_embedding, $queryEmbedding) AS score
+WHERE score > $threshold
+RETURN n.name AS name, score
+ORDER BY score DESC
+LIMIT $limit
+'''
+
+INDEX_QUERY = '''
+CALL db.index.vector.queryNodes($indexName, $limit, $queryEmbedding)
+YIELD node AS n, score
+WHERE score > $threshold
+RETURN n.name AS name, score
+ORDER BY score DESC
+'''
+
+
+def random_unit_vectors(rng, count):
+    vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def cleanup(driver):
+    driver.execute_query(f"DROP INDEX {BENCH_INDEX} IF EXISTS", database_=db_name)
+    with driver.session(database=db_name) as session:
+        session.run(f'''
+        MATCH (n:{BENCH_LABEL})
+        CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 10000 ROWS
+        ''').consume()
+
+
+def populate(driver, rng, size):
+    for start in range(0, size, WRITE_BATCH):
+        count = min(WRITE_BATCH, size - start)
+        vectors = random_unit_vectors(rng, count)
+        rows = [{"name": f"bench_{start + i}", "embedding": vectors[i].tolist()} for i in range(count)]
+        driver.execute_query(
+            f"UNWIND $rows AS row CREATE (n:{BENCH_LABEL} {{name: row.name, description_embedding: row.embedding}})",
+            rows=rows,
+            database_=db_name
+        )
+
+    driver.execute_query(f'''
+    CREATE VECTOR INDEX {BENCH_INDEX} IF NOT EXISTS
+    FOR (n:{BENCH_LABEL}) ON n.description_embedding
+    OPTIONS {{indexConfig: {{`vector.dimensions`: $dimension, `vector.similarity_function`: 'cosine'}}}}
+    ''', dimension=dimension, database_=db_name)
+    driver.execute_query("CALL db.awaitIndexes(600)", database_=db_name)
+
+
+def time_query(driver, cypher, query_vectors, **params):
+    timings = []
+    for vector in query_vectors:
+        start = time.perf_counter()
+        driver.execute_query(cypher, queryEmbedding=vector.tolist(), database_=db_name, **params)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), sorted(timings)[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    rng = np.random.default_rng(42)
+    driver = neo4j.GraphDatabase.driver(uri, auth=auth)
+    driver.verify_connectivity()
+
+    params = {
+        "threshold": rag_config.get("similarity_threshold", 0.7),
+        "limit": rag_config.get("top_k", 20),
+    }
+
+    rows = []
+    try:
+        for size in GRAPH_SIZES:
+            cleanup(driver)
+            print(f"Populating {size} nodes...")
+            populate(driver, rng, size)
+
+            query_vectors = random_unit_vectors(rng, QUERIES_PER_SIZE)
+            # Warm up page cache and query plans for both paths
+            time_query(driver, SCAN_QUERY, query_vectors[:3], **params)
+            time_query(driver, INDEX_QUERY, query_vectors[:3], indexName=BENCH_INDEX, **params)
+
+            scan_p50, scan_p95 = time_query(driver, SCAN_QUERY, query_vectors, **params)
+            index_p50, index_p95 = time_query(driver, INDEX_QUERY, query_vectors, indexName=BENCH_INDEX, **params)
+            rows.append((size, scan_p50, scan_p95, index_p50, index_p95))
+    finally:
+        cleanup(driver)
+        driver.close()
+
+    print(f"\n{'nodes':>8} | {'scan p50':>10} | {'scan p95':>10} | {'index p50':>10} | {'index p95':>10} | {'speedup':>8}")
+    print("-" * 72)
+    for size, scan_p50, scan_p95, index_p50, index_p95 in rows:
+        print(f"{size:>8} | {scan_p50:>8.2f}ms | {scan_p95:>8.2f}ms | {index_p50:>8.2f}ms | {index_p95:>8.2f}ms | {scan_p50 / index_p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,15 @@ from dotenv import load_dotenv
 load_dotenv()
 import streamlit as st
 from multi_agent_system import create_langgraph_multi_agent_system
+from models.embedding import start_embedding_warm_up
 from tools.live_feedback import get_feedback, FeedbackDisplay
 
 # Page Config
 st.set_page_config("AI Engineering Crew", layout="wide")
 
+# Load the embedding model in the background while the first question is typed
+start_embedding_warm_up()
+
 # Initialize the multi-agent system with LangGraph
 if "multi_agent_system" not in st.session_state:
     st.session_state.multi_agent_system = create_langgraph_multi_agent_system()
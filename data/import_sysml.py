@@ -0,0 +1,470 @@
+from dotenv import load_dotenv
+
+load_dotenv()
+import argparse
+import os
+import re
+import time
+import logging
+
+import neo4j
+from utils.utils import load_config
+from data.knowledgegraph import bump_graph_version
+from data.upload_to_neo4j import count_cypher_graph
+
+logger = logging.getLogger(__name__)
+
+# Database connection credentials
+password = os.getenv("NEO4J_ADMIN")
+
+# Load configuration
+config = load_config()
+neo4j_config = config.get("neo4j", {})
+uri = neo4j_config.get("uri", "")
+auth = (neo4j_config.get("username", ""), password)
+db_name = neo4j_config.get("database", "")
+
+SYSML_FILE = os.path.join("data", "bev_sysml_model.sysml")
+# Cypher script of the same model, to report where the two disagree
+CYPHER_FILE = os.path.join("data", "bev.cypher")
+BATCH_SIZE = 1000
+
+# Graph labels of the BEV model, the same ones data/bev.cypher uses. Requirements
+# are classified by the requirement group they are nested in, part defs by package.
+REQUIREMENT_LABELS = {
+    "FunctionalRequirements": "functional_requirement",
+    "PerformanceRequirements": "performance_requirement",
+    "ResourceRequirements": "ressource_requirement",
+    "DesignRequirements": "design_requirement",
+}
+PART_LABELS = {
+    "LogicalArchitecture": "solution",
+    "PhysicalArchitecture": "product",
+}
+# Every label the import writes. Re-importing deletes only these nodes, so the
+# simulation models (:model, :model_input, :model_output) and anything else
+# attached to the BEV model survive it.
+IMPORTED_LABELS = sorted({
+    *REQUIREMENT_LABELS.values(), *PART_LABELS.values(),
+    "function", "function_input", "function_output", "attribute",
+})
+
+# Property holding the qualified name of an imported node, since names repeat within
+# a label (attribute 'type', function_input 'sensorData', ...)
+KEY_PROPERTY = "sysml_key"
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+|//[^\n]*)
+  | (?P<doc>doc\s*/\*.*?\*/)
+  | (?P<comment>/\*.*?\*/)
+  | (?P<name>'(?:[^'\\]|\\.)*')
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<symbol>::|[{};:=,])
+  | (?P<word>[^\s{};:=,'"]+)
+""", re.S | re.X)
+_CAMEL_CASE_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+def humanize(name):
+    """'UserAuthentication' -> 'User Authentication', 'keyFobSignal' -> 'Key Fob Signal'"""
+    return " ".join(word[:1].upper() + word[1:] for word in _CAMEL_CASE_PATTERN.sub(" ", name).split())
+
+
+def _doc_text(token):
+    """Text of a `doc /* ... */` comment, without the comment markers and leading '*'"""
+    body = token[token.index("/*") + 2:-2]
+    return " ".join(line.strip().lstrip("*").strip() for line in body.splitlines()).strip()
+
+
+def _unquote(token):
+    return token[1:-1].replace("\\'", "'") if token.startswith("'") else token
+
+
+def tokenize_sysml(text):
+    """(kind, value) tokens of SysML textual notation, whitespace and comments dropped"""
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind not in ("space", "comment"):
+            yield kind, match.group()
+
+
+def _split_reference(tokens):
+    """('A', '::', 'B') -> ('A', 'B')"""
+    return tuple(_unquote(value) for kind, value in tokens if value != "::")
+
+
+def parse_sysml(text):
+    """
+    Parse the BEV SysML model into node and edge tables.
+
+    Returns (nodes, edges, unresolved): nodes maps a graph label to rows of
+    {"key", "properties"}, edges maps (type, start label, end label) to rows of
+    {"start", "end"} node keys, and unresolved lists the part / satisfy /
+    perform / connect references that name no known element. Node keys are qualified names,
+    so elements with the same name in different packages stay distinct.
+    """
+    definitions = {}   # qualified path -> (label, key)
+    usages = {}        # (scope path, usage name) -> type reference (path)
+    nodes = {}
+    references = []    # (type, start, end, scope), resolved after the whole model is read
+    compositions = []  # (owner node, part type reference, scope) of part usages in parts
+    edges_direct = []  # (type, start node, end node) of ports and attributes
+    stack = []         # open elements: {"kind", "name", "path", "node"}
+    declaration = []
+
+    def add_node(label, path, properties):
+        key = "::".join(path)
+        nodes.setdefault(label, []).append({"key": key, "properties": properties})
+        definitions[path] = (label, key)
+        return {"label": label, "key": key, "properties": properties}
+
+    def open_element(tokens):
+        words = [value for kind, value in tokens if kind in ("word", "name")]
+        kind = " ".join(words[:2]) if len(words) > 1 and words[1] == "def" else words[0] if words else ""
+        parent = stack[-1] if stack else None
+        parent_path = parent["path"] if parent else ()
+        name = _unquote(words[2] if kind.endswith(" def") else words[1]) if len(words) > 1 else ""
+        path = parent_path + (name,)
+        node = None
+
+        if kind == "requirement" and parent and parent["kind"] in ("requirement", "requirement def"):
+            # Leaf requirements sit in a group such as 'FunctionalRequirements'
+            label = REQUIREMENT_LABELS.get(parent["name"])
+            if label:
+                node = add_node(label, path, {"name": name, "label": f"{humanize(name)} Requirement"})
+        elif kind == "action def":
+            node = add_node("function", path, {"name": name, "label": f"{humanize(name)} Function"})
+        elif kind == "part def":
+            label = PART_LABELS.get(parent["name"] if parent else "")
+            if label:
+                node = add_node(label, path, {"name": name, "label": humanize(name)})
+        elif kind == "part":
+            reference = _split_reference(tokens[tokens.index(("symbol", ":")) + 1:]) \
+                if ("symbol", ":") in tokens else ()
+            usages[(parent_path, name)] = reference
+            if parent and parent["kind"] == "package":
+                # The system of interest, e.g. 'part vehicle : 'BatteryElectricVehicle'', is typed
+                # by its package rather than a part def: it becomes the top-level product itself
+                type_name = reference[-1] if reference else name
+                node = add_node("product", path, {"name": type_name, "label": humanize(type_name)})
+                usages[(parent_path, name)] = (name,)
+            elif parent and parent["node"] and parent["node"]["label"] in PART_LABELS.values():
+                compositions.append((parent["node"], reference, parent_path))
+
+        stack.append({"kind": kind, "name": name, "path": path, "node": node})
+
+    def close_statement(tokens):
+        if not tokens:
+            return
+        head = tokens[0][1]
+        parent = stack[-1] if stack else None
+        parent_path = parent["path"] if parent else ()
+        owner = parent["node"] if parent else None
+
+        if head in ("in", "out") and owner and owner["label"] == "function":
+            name = tokens[1][1]
+            direction = "input" if head == "in" else "output"
+            port = add_node(f"function_{direction}", parent_path + (name,), {
+                "name": name,
+                "description": f"{humanize(name).capitalize()} {direction}",
+                "label": humanize(name),
+            })
+            edges_direct.append(("HAS", owner, port))
+        elif head == "attribute" and owner:
+            name = tokens[1][1]
+            values = [value for kind, value in tokens if kind == "string"]
+            value = values[-1][1:-1] if values else ""
+            attribute = add_node("attribute", parent_path + (name,), {
+                "name": name,
+                "value": value,
+                "description": f"{humanize(name)} of {owner['properties']['label']}: {value}",
+                "label": f"{owner['properties']['label']} {humanize(name)}",
+            })
+            edges_direct.append(("HAS", owner, attribute))
+        elif head == "part":
+            open_element(tokens)
+            stack.pop()
+        elif head == "perform" and len(tokens) > 3:
+            # perform <part usage> <action usage> : <action def reference>
+            performer, action = tokens[1][1], tokens[2][1]
+            reference = _split_reference(tokens[4:])
+            usages[(parent_path, action)] = reference
+            references.append(("PERFORMS", performer, reference, parent_path))
+        elif head == "satisfy" and ("word", "to") in tokens:
+            to = tokens.index(("word", "to"))
+            references.append(("MUST_SATISFY", tokens[1][1], _split_reference(tokens[to + 1:]), parent_path))
+        elif head == "connect" and ("word", "to") in tokens:
+            to = tokens.index(("word", "to"))
+            references.append(("REALIZES", tokens[1][1], tokens[to + 1][1], parent_path))
+
+    for kind, value in tokenize_sysml(text):
+        if kind == "doc":
+            if stack and stack[-1]["node"]:
+                stack[-1]["node"]["properties"]["description"] = _doc_text(value)
+        elif value == "{":
+            open_element(declaration)
+            declaration = []
+        elif value == "}":
+            close_statement(declaration)
+            declaration = []
+            if stack:
+                stack.pop()
+        elif value == ";":
+            close_statement(declaration)
+            declaration = []
+        else:
+            declaration.append((kind, value))
+
+    def resolve_definition(reference, scope_path):
+        # Qualified names are looked up from the innermost enclosing namespace outwards
+        for i in range(len(scope_path), -1, -1):
+            definition = definitions.get(scope_path[:i] + tuple(reference))
+            if definition:
+                return definition
+        return None
+
+    def resolve_usage(name, scope_path):
+        for i in range(len(scope_path), -1, -1):
+            if (scope_path[:i], name) in usages:
+                return resolve_definition(usages[(scope_path[:i], name)], scope_path[:i])
+        return None
+
+    edges = {}
+    for rel_type, start, end in edges_direct:
+        edges.setdefault((rel_type, start["label"], end["label"]), []).append({"start": start["key"], "end": end["key"]})
+
+    unresolved = []
+    for owner, reference, scope_path in compositions:
+        part = resolve_definition(reference, scope_path)
+        if part is None:
+            unresolved.append(f"IS_COMPOSED_OF {owner['key']} -> {'::'.join(reference)}")
+        elif part[0] == owner["label"]:
+            # Logical parts of the vehicle are tied to its products by REALIZES only
+            edges.setdefault(("IS_COMPOSED_OF", owner["label"], part[0]), []).append(
+                {"start": owner["key"], "end": part[1]})
+
+    for rel_type, start_name, end_reference, scope_path in references:
+        start = resolve_usage(start_name, scope_path)
+        if rel_type == "REALIZES":
+            # connect <physical part> to <logical part>: the product realizes the solution
+            end = resolve_usage(end_reference, scope_path)
+        else:
+            end = resolve_definition(end_reference, scope_path)
+        if start is None or end is None:
+            target = "::".join(end_reference) if isinstance(end_reference, tuple) else end_reference
+            unresolved.append(f"{rel_type} {start_name} -> {target}")
+            continue
+        edges.setdefault((rel_type, start[0], end[0]), []).append({"start": start[1], "end": end[1]})
+
+    if unresolved:
+        logger.warning(f"{len(unresolved)} SysML references could not be resolved")
+    return nodes, edges, unresolved
+
+
+def compare_with_cypher(nodes, edges, cypher_file):
+    """
+    Lines describing where the parsed tables and the graph a Cypher script creates
+    differ in counts. Labels the import does not write, such as :model, are left out.
+    """
+    with open(cypher_file, "r", encoding="utf-8") as source:
+        cypher_nodes, cypher_edges = count_cypher_graph(source)
+    cypher_nodes = {label: count for label, count in cypher_nodes.items() if label in IMPORTED_LABELS}
+    cypher_edges = {key: count for key, count in cypher_edges.items()
+                    if key[1] in IMPORTED_LABELS and key[2] in IMPORTED_LABELS}
+
+    differences = []
+    sysml_nodes = {label: len(rows) for label, rows in nodes.items()}
+    for label in sorted(set(sysml_nodes) | set(cypher_nodes)):
+        if sysml_nodes.get(label, 0) != cypher_nodes.get(label, 0):
+            differences.append(f":{label}: {sysml_nodes.get(label, 0)} here, {cypher_nodes.get(label, 0)} in Cypher")
+    sysml_edges = {key: len(rows) for key, rows in edges.items()}
+    for key in sorted(set(sysml_edges) | set(cypher_edges)):
+        if sysml_edges.get(key, 0) != cypher_edges.get(key, 0):
+            rel_type, start_label, end_label = key
+            differences.append(f"(:{start_label})-[:{rel_type}]->(:{end_label}): "
+                               f"{sysml_edges.get(key, 0)} here, {cypher_edges.get(key, 0)} in Cypher")
+    return differences
+
+
+def save_external_links(driver):
+    """
+    Relationships between imported nodes and the rest of the graph, such as
+    (:solution)-[:HAS]->(:model), as rows to restore with restore_external_links.
+    The imported end is identified by its qualified key (its name for nodes of an
+    older import without one), the other end by elementId.
+    """
+    records, _, _ = driver.execute_query(
+        f'''
+        MATCH (n)-[r]-(m)
+        WHERE any(label IN labels(n) WHERE label IN $labels)
+          AND NOT any(label IN labels(m) WHERE label IN $labels)
+        RETURN [label IN labels(n) WHERE label IN $labels][0] AS label, n.`{KEY_PROPERTY}` AS key, n.name AS name,
+               type(r) AS type, startNode(r) = n AS outgoing, elementId(m) AS other,
+               properties(r) AS properties
+        ''',
+        labels=IMPORTED_LABELS,
+        database_=db_name
+    )
+    return [record.data() for record in records]
+
+
+def delete_model_graph(driver):
+    """Remove the nodes of the imported labels, in batches"""
+    with driver.session(database=db_name) as session:
+        summary = session.run('''
+            MATCH (n) WHERE any(label IN labels(n) WHERE label IN $labels)
+            CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+        ''', labels=IMPORTED_LABELS).consume()
+    return summary.counters.nodes_deleted
+
+
+def restore_external_links(driver, links, nodes):
+    """
+    Re-attach the rows of save_external_links to the freshly imported nodes.
+
+    A link saved without a key is only restored when its name is unique within the
+    label in the new model, otherwise it would be copied onto every node of that
+    name. Returns (restored, dropped) counts.
+    """
+    keys_by_name = {}
+    for label, rows in nodes.items():
+        for row in rows:
+            keys_by_name.setdefault((label, row["properties"].get("name")), []).append(row["key"])
+
+    groups = {}
+    dropped = 0
+    for link in links:
+        key = link["key"]
+        if key is None:
+            candidates = keys_by_name.get((link["label"], link["name"]), [])
+            if len(candidates) != 1:
+                logger.warning(f"Not restoring {link['type']} link of :{link['label']} '{link['name']}', "
+                               f"{len(candidates)} imported nodes have that name")
+                dropped += 1
+                continue
+            key = candidates[0]
+        groups.setdefault((link["label"], link["type"], link["outgoing"]), []).append({**link, "key": key})
+
+    restored = 0
+    for (label, rel_type, outgoing), rows in groups.items():
+        pattern = f"(n)-[r:`{rel_type}`]->(m)" if outgoing else f"(m)-[r:`{rel_type}`]->(n)"
+        _, summary, _ = driver.execute_query(
+            f'''
+            UNWIND $rows AS row
+            MATCH (n:`{label}` {{`{KEY_PROPERTY}`: row.key}})
+            MATCH (m) WHERE elementId(m) = row.other
+            CREATE {pattern}
+            SET r = row.properties
+            ''',
+            rows=rows,
+            database_=db_name
+        )
+        restored += summary.counters.relationships_created
+    return restored, dropped
+
+
+def load_graph(driver, nodes, edges, batch_size=BATCH_SIZE):
+    """
+    Write node and edge tables with parameterized UNWIND batches.
+
+    Every node stores its qualified key, so equal names in different packages
+    cannot be confused. Node creation returns the elementId of every key, and
+    edges are matched by elementId.
+    """
+    element_ids = {}
+    for label, rows in nodes.items():
+        driver.execute_query(f"CREATE INDEX IF NOT EXISTS FOR (n:`{label}`) ON (n.name)", database_=db_name)
+        driver.execute_query(f"CREATE INDEX IF NOT EXISTS FOR (n:`{label}`) ON (n.`{KEY_PROPERTY}`)",
+                             database_=db_name)
+        for i in range(0, len(rows), batch_size):
+            records, _, _ = driver.execute_query(
+                f'''
+                UNWIND $rows AS row
+                CREATE (n:`{label}`)
+                SET n = row.properties, n.`{KEY_PROPERTY}` = row.key
+                RETURN row.key AS key, elementId(n) AS id
+                ''',
+                rows=rows[i:i + batch_size],
+                database_=db_name
+            )
+            element_ids.update((record["key"], record["id"]) for record in records)
+
+    relationship_count = 0
+    for (rel_type, _, _), rows in edges.items():
+        id_rows = [{"start": element_ids[row["start"]], "end": element_ids[row["end"]]} for row in rows]
+        for i in range(0, len(id_rows), batch_size):
+            _, summary, _ = driver.execute_query(
+                f'''
+                UNWIND $rows AS row
+                MATCH (a) WHERE elementId(a) = row.start
+                MATCH (b) WHERE elementId(b) = row.end
+                CREATE (a)-[:`{rel_type}`]->(b)
+                ''',
+                rows=id_rows[i:i + batch_size],
+                database_=db_name
+            )
+            relationship_count += summary.counters.relationships_created
+
+    return len(element_ids), relationship_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the BEV SysML model directly into Neo4j, replacing the "
+                                                 "previously imported model")
+    parser.add_argument("--file", default=SYSML_FILE, help=f"SysML textual model (default: {SYSML_FILE})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per UNWIND query")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and print the tables without touching Neo4j")
+    parser.add_argument("--compare", default=CYPHER_FILE,
+                        help=f"Cypher script to report count differences against, '' to skip (default: {CYPHER_FILE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.file, "r", encoding="utf-8") as sysml_file:
+        nodes, edges, unresolved = parse_sysml(sysml_file.read())
+    parse_seconds = time.perf_counter() - start
+
+    print(f"Parsed {args.file} in {parse_seconds:.3f}s:")
+    for label, rows in sorted(nodes.items()):
+        print(f"  {len(rows):>5} :{label}")
+    for (rel_type, start_label, end_label), rows in sorted(edges.items()):
+        print(f"  {len(rows):>5} (:{start_label})-[:{rel_type}]->(:{end_label})")
+    for reference in unresolved:
+        print(f"  unresolved: {reference}")
+
+    if args.compare and os.path.exists(args.compare):
+        differences = compare_with_cypher(nodes, edges, args.compare)
+        print(f"Differences to {args.compare}: {len(differences) or 'none'}")
+        for difference in differences:
+            print(f"  {difference}")
+
+    if args.dry_run:
+        return
+
+    driver = neo4j.GraphDatabase.driver(uri, auth=auth)
+    driver.verify_connectivity()
+    try:
+        load_start = time.perf_counter()
+        links = save_external_links(driver)
+        deleted = delete_model_graph(driver)
+        delete_seconds = time.perf_counter() - load_start
+
+        node_count, relationship_count = load_graph(driver, nodes, edges, args.batch_size)
+        restored, dropped = restore_external_links(driver, links, nodes)
+        load_seconds = time.perf_counter() - load_start - delete_seconds
+
+        # Let running agents drop caches derived from the previous graph state
+        bump_graph_version(driver, db_name)
+    finally:
+        driver.close()
+
+    total_seconds = time.perf_counter() - start
+    print(f"""
+Replaced {deleted} nodes with {node_count} nodes and {relationship_count} relationships.
+Restored {restored} of {len(links)} relationships to nodes outside the imported model ({dropped} ambiguous).
+Parse: {parse_seconds:.2f}s, delete: {delete_seconds:.2f}s, load: {load_seconds:.2f}s, total: {total_seconds:.2f}s.
+Recreate the embeddings with: python -m utils.create_embeddings
+    """)
+
+
+if __name__ == "__main__":
+    main()
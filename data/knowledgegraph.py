@@ -1,7 +1,14 @@
 from langchain_neo4j import Neo4jGraph
 from utils.utils import load_config
+import neo4j
+import threading
 import logging
+import atexit
+import json
+import re
+import time
 import os
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -9,42 +16,356 @@ logger = logging.getLogger(__name__)
 NEO4J_ADMIN = os.getenv('NEO4J_ADMIN')
 NEO4J_SEARCHAGENT = os.getenv('NEO4J_AGENT')
 config = load_config()
+pool_config = config.get("neo4j_pool", {})
+graph_cache_config = config.get("graph_cache", {})
+vector_index_config = config.get("vector_index", {})
 
+# Marker node holding a counter that scripts modifying the graph increment
+# (see bump_graph_version). Caches of derived data compare against it.
+GRAPH_META_LABEL = "_GraphMeta"
 
-def get_graph():
-    """Returns a fresh Neo4jGraph instance using the current configuration."""
-    neo4j_config = config.get("neo4j", {})
-
-    # Extract connection details
-    url = neo4j_config.get("uri", "")
-    username = neo4j_config.get("username", "")
-    password = NEO4J_ADMIN
-    database = neo4j_config.get("database", "")
-
-    logger.info(f"Initializing Neo4j graph connection to {url} (database: {database})")
-
-    return Neo4jGraph(
-        url=url,
-        username=username,
-        password=password,
-        database=database
+# Bookkeeping kept out of the schema shown to the LLM: the shared label of embedded
+# nodes (utils/create_vectorindex.py) and the per-set embedding properties
+# (models.embedding.get_embedding_set), with or without a version suffix
+_HIDDEN_SCHEMA_LABELS = {GRAPH_META_LABEL, vector_index_config.get("label", "Embedded")}
+_HIDDEN_PROPERTY_PATTERN = re.compile(
+    r"(?:%s|embedding_hash|embedding_model|embedding_updated_at)(?:_\w+)?"
+    % re.escape(vector_index_config.get("property", "description_embedding"))
+)
+
+# Password environment values for each connection section in config.json
+_PASSWORDS = {
+    "neo4j": NEO4J_ADMIN,
+    "neo4j_agent": NEO4J_SEARCHAGENT,
+}
+
+# Process-wide registries: one pooled driver per credential set, and one
+# Neo4jGraph per credential set and database sharing that driver
+_drivers = {}
+_graphs = {}
+_registry_lock = threading.RLock()
+
+# Last graph version marker read per graph key, with the time it was read,
+# and the version each cached schema was introspected at
+_known_versions = {}
+_schema_versions = {}
+
+# Clauses that make a query a write; checked after string literals are removed
+_WRITE_CLAUSE_PATTERN = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b", re.IGNORECASE)
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+
+def _connection_settings(config_key):
+    neo4j_config = config.get(config_key, {})
+    return (
+        neo4j_config.get("uri", ""),
+        neo4j_config.get("username", ""),
+        _PASSWORDS.get(config_key),
+        neo4j_config.get("database", ""),
     )
 
+
+def _driver_options():
+    """Pool settings from config.json passed through to neo4j.GraphDatabase.driver"""
+    return {
+        "max_connection_pool_size": pool_config.get("max_connection_pool_size", 20),
+        "connection_acquisition_timeout": pool_config.get("connection_acquisition_timeout", 30),
+        "max_connection_lifetime": pool_config.get("max_connection_lifetime", 3600),
+        # Idle pooled connections older than this are pinged before being handed out
+        "liveness_check_timeout": pool_config.get("liveness_check_timeout", 30),
+    }
+
+
+def get_driver(config_key="neo4j"):
+    """Returns the shared pooled driver for a connection section of config.json ("neo4j" or "neo4j_agent")."""
+    url, username, password, _ = _connection_settings(config_key)
+    key = (url, username, password)
+
+    with _registry_lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            logger.info(f"Creating pooled Neo4j driver for {username}@{url}")
+            driver = neo4j.GraphDatabase.driver(url, auth=(username, password), **_driver_options())
+            driver.verify_connectivity()
+            _drivers[key] = driver
+        return driver
+
+
+class QueryResultCache:
+    """
+    LRU cache of read query results keyed on Cypher text and parameters.
+
+    Size is bounded by an approximate memory budget (serialized result size). Entries
+    belong to one graph version; when the version moves the cache is emptied.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query, params):
+        return f"{query}\x1f{json.dumps(params or {}, sort_keys=True, default=str)}"
+
+    def get(self, key, graph_version):
+        with self._lock:
+            self._check_version(graph_version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(row) for row in entry[0]]
+
+    def put(self, key, graph_version, rows):
+        size = len(key) + len(json.dumps(rows, default=str))
+        # A single oversized result would flush everything else, keep it out
+        if size > self.max_bytes // 4:
+            return
+
+        with self._lock:
+            self._check_version(graph_version)
+            if key in self._entries:
+                self.used_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = ([dict(row) for row in rows], size)
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.used_bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_bytes": self.used_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _check_version(self, graph_version):
+        if graph_version != self._version:
+            self._entries.clear()
+            self.used_bytes = 0
+            self._version = graph_version
+
+
+def is_write_query(query):
+    """True if the Cypher contains a write clause outside of string literals"""
+    return bool(_WRITE_CLAUSE_PATTERN.search(_STRING_LITERAL_PATTERN.sub("", query)))
+
+
+class CachedNeo4jGraph(Neo4jGraph):
+    """Neo4jGraph whose read queries are served from a QueryResultCache"""
+
+    def __init__(self, *args, config_key="neo4j_agent", **kwargs):
+        # Set before Neo4jGraph.__init__, which may already issue queries
+        self.config_key = config_key
+        self.result_cache = QueryResultCache(
+            max_bytes=graph_cache_config.get("result_cache_max_bytes", 16 * 1024 * 1024)
+        )
+        super().__init__(*args, **kwargs)
+
+    def query(self, query, params={}, **kwargs):
+        if not graph_cache_config.get("result_cache", True) or kwargs:
+            return super().query(query, params, **kwargs)
+
+        if is_write_query(query):
+            result = super().query(query, params)
+            # Our own write: drop local results now and tell other processes
+            self.result_cache.clear()
+            try:
+                _, _, _, database = _connection_settings(self.config_key)
+                bump_graph_version(self._driver, database)
+            except Exception as e:
+                logger.warning(f"Could not bump graph version after write: {str(e)}")
+            return result
+
+        graph_version = current_graph_version(self.config_key)
+        key = QueryResultCache.make_key(query, params)
+        rows = self.result_cache.get(key, graph_version)
+        if rows is None:
+            rows = super().query(query, params)
+            self.result_cache.put(key, graph_version, rows)
+        return rows
+
+
+def _get_shared_graph(config_key):
+    key = _connection_settings(config_key)
+    url, username, password, database = key
+
+    with _registry_lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            logger.info(f"Initializing Neo4j graph connection to {url} (database: {database})")
+            # Schema introspection is deferred to get_graph_schema(), the
+            # simulation tools never need it. Read queries go through the
+            # result cache.
+            graph = CachedNeo4jGraph(
+                url=url,
+                username=username,
+                password=password,
+                database=database,
+                refresh_schema=False,
+                config_key=config_key
+            )
+            # Neo4jGraph always opens its own driver; hand it the pooled one instead
+            graph._driver.close()
+            graph._driver = get_driver(config_key)
+            _graphs[key] = graph
+        return graph
+
+
+def get_graph():
+    """Returns the shared Neo4jGraph instance using the current configuration."""
+    return _get_shared_graph("neo4j")
+
+
 def get_agent_graph():
-    """Returns a fresh Neo4jGraph instance using the agent configuration."""
-    neo4j_config = config.get("neo4j_agent", {})
-
-    # Extract connection details
-    url = neo4j_config.get("uri", "")
-    username = neo4j_config.get("username", "")
-    password = NEO4J_SEARCHAGENT
-    database = neo4j_config.get("database", "")
-
-    logger.info(f"Initializing Neo4j graph connection to {url} (database: {database})")
-
-    return Neo4jGraph(
-        url=url,
-        username=username,
-        password=password,
-        database=database
-    )
\ No newline at end of file
+    """Returns the shared Neo4jGraph instance using the agent configuration."""
+    return _get_shared_graph("neo4j_agent")
+
+
+def get_graph_version(config_key="neo4j_agent"):
+    """Returns the current graph version marker, 0 if the graph was never marked."""
+    _, _, _, database = _connection_settings(config_key)
+    records, _, _ = get_driver(config_key).execute_query(
+        f"MATCH (m:{GRAPH_META_LABEL} {{key: 'graph'}}) RETURN m.version AS version",
+        database_=database
+    )
+    return records[0].get("version") if records else 0
+
+
+def bump_graph_version(driver=None, database=None):
+    """Advance the graph version marker. Call after any change to nodes, embeddings or indexes."""
+    if driver is None:
+        driver = get_driver("neo4j")
+        database = config.get("neo4j", {}).get("database", "")
+
+    records, _, _ = driver.execute_query(
+        f"""
+        MERGE (m:{GRAPH_META_LABEL} {{key: 'graph'}})
+        // Seeded from the clock so the version still moves if the marker was deleted
+        WITH m, coalesce(m.version, 0) + 1 AS next
+        SET m.version = CASE WHEN timestamp() > next THEN timestamp() ELSE next END,
+            m.updatedAt = timestamp()
+        RETURN m.version AS version
+        """,
+        database_=database
+    )
+    version = records[0].get("version")
+    logger.info(f"Graph version bumped to {version}")
+    return version
+
+
+def current_graph_version(config_key="neo4j_agent"):
+    """
+    Returns the graph version marker as seen by this process.
+
+    The marker is re-read at most every graph_cache.version_check_interval seconds,
+    so caches can compare against it on every lookup without a round trip each time.
+    """
+    key = _connection_settings(config_key)
+    check_interval = graph_cache_config.get("version_check_interval", 5)
+
+    with _registry_lock:
+        version, checked_at = _known_versions.get(key, (None, 0))
+        if version is None or time.time() - checked_at >= check_interval:
+            version = get_graph_version(config_key)
+            _known_versions[key] = (version, time.time())
+        return version
+
+
+def _format_schema(structured_schema):
+    """Schema string in the format of Neo4jGraph.refresh_schema, from a structured schema"""
+    def properties(props):
+        return ", ".join(f"{prop['property']}: {prop['type']}" for prop in props)
+
+    return "\n".join([
+        "Node properties:",
+        "\n".join(f"{label} {{{properties(props)}}}" for label, props in structured_schema["node_props"].items()),
+        "Relationship properties:",
+        "\n".join(f"{rel_type} {{{properties(props)}}}" for rel_type, props in structured_schema["rel_props"].items()),
+        "The relationships:",
+        "\n".join(f"(:{rel['start']})-[:{rel['type']}]->(:{rel['end']})" for rel in structured_schema["relationships"]),
+    ])
+
+
+def _strip_bookkeeping(structured_schema):
+    """Drop hidden labels, relationships touching them and embedding properties, in place"""
+    node_props = structured_schema.setdefault("node_props", {})
+    for label in _HIDDEN_SCHEMA_LABELS:
+        node_props.pop(label, None)
+    for label, props in node_props.items():
+        node_props[label] = [prop for prop in props if not _HIDDEN_PROPERTY_PATTERN.fullmatch(prop["property"])]
+    structured_schema.setdefault("rel_props", {})
+    structured_schema["relationships"] = [
+        rel for rel in structured_schema.get("relationships", [])
+        if rel["start"] not in _HIDDEN_SCHEMA_LABELS and rel["end"] not in _HIDDEN_SCHEMA_LABELS
+    ]
+
+
+def refresh_graph_schema(config_key="neo4j_agent"):
+    """Introspect the database schema now and cache it on the shared graph."""
+    graph = _get_shared_graph(config_key)
+    key = _connection_settings(config_key)
+
+    with _registry_lock:
+        version = get_graph_version(config_key)
+        logger.info(f"Introspecting graph schema (graph version {version})")
+        # Depending on the langchain_neo4j version, introspection goes through query(),
+        # which would answer from results cached under the unchanged graph version
+        graph.result_cache.clear()
+        graph.refresh_schema()
+
+        # Keep the version marker, the index label and embedding properties out of the
+        # schema shown to the LLM
+        _strip_bookkeeping(graph.structured_schema)
+        graph.schema = _format_schema(graph.structured_schema)
+
+        _known_versions[key] = (version, time.time())
+        _schema_versions[key] = version
+        return graph.schema
+
+
+def get_graph_schema(config_key="neo4j_agent"):
+    """
+    Returns the cached schema string of the shared graph.
+
+    The schema is introspected once and re-introspected only when the graph version
+    marker has moved (see current_graph_version), so introspection stays off the
+    per-query path.
+    """
+    graph = _get_shared_graph(config_key)
+    key = _connection_settings(config_key)
+
+    with _registry_lock:
+        if key not in _schema_versions or current_graph_version(config_key) != _schema_versions[key]:
+            return refresh_graph_schema(config_key)
+        return graph.schema
+
+
+@atexit.register
+def close_drivers():
+    """Close all pooled drivers. Later calls to get_driver()/get_*graph() reconnect."""
+    with _registry_lock:
+        _graphs.clear()
+        _known_versions.clear()
+        _schema_versions.clear()
+        for driver in _drivers.values():
+            try:
+                driver.close()
+            except Exception as e:
+                logger.warning(f"Error closing Neo4j driver: {str(e)}")
+        _drivers.clear()
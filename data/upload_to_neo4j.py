@@ -1,33 +1,245 @@
 import re
 import time
+import random
 import logging
+import io
+import os
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, TextIO, Union
 from datetime import datetime
 from neo4j import GraphDatabase
-from neo4j.exceptions import Neo4jError, ServiceUnavailable
+from neo4j.exceptions import Neo4jError, ServiceUnavailable, SessionExpired, TransientError
 from tqdm import tqdm
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'neo4j_upload_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Errors after which the same work can succeed when simply run again
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+DEADLOCK_CODE = "Neo.TransientError.Transaction.DeadlockDetected"
+
+# Statement shapes of bev.cypher that the bulk loader turns into parameter rows
+_NODE_PATTERN = re.compile(r"^CREATE\s*\(\s*\w*\s*:\s*(\w+)\s*\{(.*)\}\s*\)\s*;?$", re.S)
+_PROPERTY_PATTERN = re.compile(r"\s*(\w+)\s*:\s*'((?:[^'\\]|\\.)*)'\s*(?:,|$)", re.S)
+_RELATIONSHIP_PATTERN = re.compile(
+    r"^MATCH\s*\(\s*(\w+)\s*:\s*(\w+)\s*\{\s*name\s*:\s*'((?:[^'\\]|\\.)*)'\s*\}\s*\)\s*"
+    r"MATCH\s*\(\s*(\w+)\s*:\s*(\w+)\s*\{\s*name\s*:\s*'((?:[^'\\]|\\.)*)'\s*\}\s*\)\s*"
+    r"CREATE\s*\(\s*(\w+)\s*\)\s*-\[\s*:\s*(\w+)\s*\]\s*->\s*\(\s*(\w+)\s*\)\s*;?$",
+    re.S | re.I
+)
+_ESCAPE_PATTERN = re.compile(r"\\(.)", re.S)
+
+
+# String literals and comments, the only places where ';', brackets and '//' are not syntax
+_LITERAL_PATTERN = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|//[^\n]*|/\*.*?\*/)""", re.S)
+_LITERAL_START_PATTERN = re.compile(r"""['"`]|/\*""")
+# Code outside literals: a line break, a ';', or text up to either
+_CODE_PATTERN = re.compile(r"\n|;|[^\n;]+")
+_SPACE_PATTERN = re.compile(r"\s+")
+# Clauses that start a new statement when a CREATE statement is complete without ';'
+_KEYWORD_PATTERN = re.compile(r"\s*(?:CREATE|MATCH|MERGE|UNWIND|CALL)\b", re.I)
+
+
+def _split_script(source: TextIO, chunk_size: int) -> Iterator[tuple]:
+    """Yield (is_literal, text) pieces of a script read in chunks, literals never cut in two"""
+    buffer = ""
+    while True:
+        chunk = source.read(chunk_size)
+        buffer += chunk
+        pieces = _LITERAL_PATTERN.split(buffer)
+        tail = pieces.pop()
+        if not chunk:
+            # A quote or '/*' left in the last piece was never closed
+            start = _LITERAL_START_PATTERN.search(tail)
+            if start:
+                logger.warning(f"Unterminated {start.group()} at the end of the script")
+                pieces += [tail[:start.start()], tail[start.start():]]
+                tail = ""
+            for index, piece in enumerate(pieces):
+                yield index % 2 == 1, piece
+            yield False, tail
+            return
+
+        # Keep what may continue in the next chunk: a literal that reaches the end of
+        # the buffer, an open literal, and the last line
+        if not tail and len(pieces) > 1:
+            tail = pieces.pop(-2) + pieces.pop()
+        start = _LITERAL_START_PATTERN.search(tail)
+        cut = min(start.start() if start else len(tail), max(tail.rfind('\n'), 0))
+        pieces.append(tail[:cut])
+        buffer = tail[cut:]
+        for index, piece in enumerate(pieces):
+            yield index % 2 == 1, piece
+
+
+def iter_cypher_statements(source: Union[str, TextIO], chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Yield the statements of a Cypher script one at a time, reading a file in chunks.
+
+    Statements end at a ';' outside brackets, string literals and comments. As in
+    bev.cypher, a statement starting with CREATE may also end without one, when its
+    brackets are closed and the next line starts a new clause. Comments are dropped
+    and whitespace outside string literals is collapsed to single spaces; every
+    yielded statement ends with ';'.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    parts = []
+    first_keyword = None
+    depth = 0
+    line_start = True
+    pending_space = False
+
+    for is_literal, piece in _split_script(source, chunk_size):
+        if is_literal:
+            if piece[0] == '/':
+                pending_space = bool(parts)
+                continue
+            tokens = (piece,)
+        else:
+            tokens = _CODE_PATTERN.findall(piece)
+
+        for token in tokens:
+            if token == '\n':
+                line_start = True
+                pending_space = bool(parts)
+                continue
+
+            if not is_literal and token != ';':
+                text = token.strip()
+                if not text:
+                    pending_space = bool(parts)
+                    continue
+                if line_start and depth == 0 and first_keyword == 'CREATE' and _KEYWORD_PATTERN.match(text):
+                    statement = "".join(parts)
+                    yield statement if statement.endswith(';') else statement + ';'
+                    parts, first_keyword = [], None
+                if token[0].isspace():
+                    pending_space = bool(parts)
+                if '  ' in text or '\t' in text or '\r' in text:
+                    text = _SPACE_PATTERN.sub(' ', text)
+                depth += (text.count('(') + text.count('[') + text.count('{')
+                          - text.count(')') - text.count(']') - text.count('}'))
+                if depth < 0:
+                    depth = 0
+            else:
+                text = token
+
+            if not parts:
+                first_keyword = text.split(None, 1)[0].upper() if text[0] not in ';\'"`' else text[0]
+            elif pending_space:
+                parts.append(' ')
+            parts.append(text)
+            line_start = False
+            pending_space = not is_literal and token[-1].isspace()
+
+            if token == ';' and depth == 0 and not is_literal:
+                statement = "".join(parts)
+                if statement != ';':
+                    yield statement
+                parts, first_keyword, pending_space = [], None, False
+
+    statement = "".join(parts)
+    if statement:
+        yield statement if statement.endswith(';') else statement + ';'
+
+
+def _unescape_cypher_string(value: str) -> str:
+    """Value of a single-quoted Cypher string literal without the quotes"""
+    return _ESCAPE_PATTERN.sub(lambda m: {'n': '\n', 't': '\t', 'r': '\r'}.get(m.group(1), m.group(1)), value)
+
+
+def _relationship_row(match) -> Optional[tuple]:
+    """((type, start label, end label), {'start', 'end'} names) of a _RELATIONSHIP_PATTERN match"""
+    (first_var, first_label, first_name, second_var, second_label, second_name,
+     start_var, rel_type, end_var) = match.groups()
+    if (start_var, end_var) == (first_var, second_var):
+        key, row = (rel_type, first_label, second_label), {'start': first_name, 'end': second_name}
+    elif (start_var, end_var) == (second_var, first_var):
+        key, row = (rel_type, second_label, first_label), {'start': second_name, 'end': first_name}
+    else:
+        return None
+    return key, {name: _unescape_cypher_string(value) for name, value in row.items()}
+
+
+def count_cypher_graph(source: Union[str, TextIO]) -> tuple:
+    """
+    Nodes per label and relationships per (type, start label, end label) that a
+    script in the statement shapes of bev.cypher creates, without running it.
+    """
+    node_counts, relationship_counts = {}, {}
+    for statement in iter_cypher_statements(source):
+        node = _NODE_PATTERN.match(statement)
+        if node:
+            node_counts[node.group(1)] = node_counts.get(node.group(1), 0) + 1
+            continue
+        relationship = _RELATIONSHIP_PATTERN.match(statement)
+        parsed = _relationship_row(relationship) if relationship else None
+        if parsed:
+            relationship_counts[parsed[0]] = relationship_counts.get(parsed[0], 0) + 1
+    return node_counts, relationship_counts
+
+
+def _query_shape(statement: str, parameters: Optional[Dict[str, Any]] = None) -> str:
+    """Kind of work a statement does; latencies are only compared within one kind"""
+    if parameters:
+        # UNWIND queries are fixed per label or relationship type
+        return statement
+    keyword = statement.split(None, 1)[0].upper() if statement.strip() else ""
+    return f"{keyword} relationship" if ']->' in statement or '<-[' in statement else keyword
+
+
+def _parse_property_map(body: str) -> Optional[Dict[str, str]]:
+    """Properties of a literal map with string values only, None for anything else"""
+    properties = {}
+    position = 0
+    body = body.strip()
+    while position < len(body):
+        match = _PROPERTY_PATTERN.match(body, position)
+        if not match:
+            return None
+        properties[match.group(1)] = _unescape_cypher_string(match.group(2))
+        position = match.end()
+    return properties
+
 
 class AdvancedNeo4jBatchUploader:
-    def __init__(self, uri: str, username: str, password: str, batch_size: int = 50, retry_attempts: int = 3):
-        """Initialize the advanced Neo4j uploader with retry logic"""
+    def __init__(self, uri: str, username: str, password: str, batch_size: int = 50, retry_attempts: int = 3,
+                 bulk_size: int = 1000, transaction_size: int = 0, pace_tolerance: float = 3.0,
+                 max_pace_delay: float = 2.0, relationship_workers: int = 1, deadlock_retry_attempts: int = 8):
+        """
+        Initialize the advanced Neo4j uploader with retry logic.
+
+        transaction_size > 0 commits that many statements per managed transaction
+        instead of running each statement in autocommit mode; statement batches
+        grow to transaction_size if batch_size is smaller. Writes are paced by
+        server latency: once the average latency per statement exceeds pace_tolerance
+        times the fastest seen for the same kind of query, the uploader waits (at
+        most max_pace_delay seconds) before the next write.
+
+        relationship_workers > 1 loads relationships on that many sessions in
+        parallel, one start-node label per task. Deadlocks between them are retried
+        up to deadlock_retry_attempts times with jittered backoff.
+        """
         self.uri = uri
         self.username = username
         self.password = password
         self.batch_size = batch_size
+        # Statements handed to execute_batch at once; a transaction never spans two batches
+        self.statement_batch_size = max(batch_size, transaction_size)
+        self.bulk_size = bulk_size
+        self.transaction_size = transaction_size
+        self.pace_tolerance = pace_tolerance
+        self.max_pace_delay = max_pace_delay
         self.retry_attempts = retry_attempts
+        self.relationship_workers = relationship_workers
+        self.deadlock_retry_attempts = deadlock_retry_attempts
+        self.stats_lock = threading.Lock()
+        # Query shape -> [lowest and moving average latency per statement]
+        self.latency_stats = {}
+        self.reset_counters()
         self.driver = None
         self.connect()
 
@@ -35,7 +247,9 @@ class AdvancedNeo4jBatchUploader:
         """Establish connection with retry logic"""
         for attempt in range(self.retry_attempts):
             try:
-                self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
+                # Transaction retries are done by execute_transaction, with retry_attempts
+                self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password),
+                                                   max_transaction_retry_time=0)
                 # Test connection
                 with self.driver.session() as session:
                     session.run("RETURN 1")
@@ -56,96 +270,9 @@ class AdvancedNeo4jBatchUploader:
             self.driver.close()
             logger.info("Neo4j connection closed")
 
-    def parse_cypher_statements(self, cypher_script: str) -> List[str]:
-        """Parse the Cypher script into individual statements with improved parsing for fixed format"""
-        # Split script into lines and handle comments
-        lines = []
-        for line in cypher_script.split('\n'):
-            # Skip "// Fixed:" comments
-            if '// Fixed:' in line:
-                continue
-            # Remove inline comments
-            if '//' in line:
-                line = line[:line.index('//')].strip()
-            if line.strip():
-                lines.append(line.strip())
-
-        statements = []
-        i = 0
-
-        while i < len(lines):
-            line = lines[i]
-
-            # Handle DELETE statement
-            if line.upper().startswith('MATCH') and 'DELETE' in line.upper():
-                statements.append(line + ';' if not line.endswith(';') else line)
-                i += 1
-                continue
-
-            # Handle multi-line MATCH...CREATE statements
-            if line.upper().startswith('MATCH'):
-                current_statement = [line]
-                i += 1
-
-                # Collect subsequent MATCH and CREATE lines
-                while i < len(lines):
-                    next_line = lines[i]
-                    if (next_line.upper().startswith('MATCH') or
-                            next_line.upper().startswith('CREATE')):
-                        current_statement.append(next_line)
-                        # If we found a CREATE line that ends with semicolon, we're done
-                        if next_line.upper().startswith('CREATE') and next_line.endswith(';'):
-                            break
-                    else:
-                        # If we find something that's not MATCH or CREATE, we might have an issue
-                        break
-                    i += 1
-
-                statement = ' '.join(current_statement)
-                if not statement.endswith(';'):
-                    statement += ';'
-                statements.append(statement)
-                i += 1
-                continue
-
-            # Handle CREATE statements (nodes or simple relationships)
-            if line.upper().startswith('CREATE'):
-                current_statement = [line]
-
-                # Check if it's a complete single-line statement
-                if line.endswith(';') or (line.count('{') == line.count('}') and
-                                          line.count('(') == line.count(')')):
-                    if not line.endswith(';'):
-                        line += ';'
-                    statements.append(line)
-                    i += 1
-                    continue
-
-                # Multi-line CREATE statement
-                i += 1
-                brace_count = line.count('{') - line.count('}')
-                paren_count = line.count('(') - line.count(')')
-
-                while i < len(lines) and (brace_count > 0 or paren_count > 0):
-                    next_line = lines[i]
-                    current_statement.append(next_line)
-                    brace_count += next_line.count('{') - next_line.count('}')
-                    paren_count += next_line.count('(') - next_line.count(')')
-                    i += 1
-
-                statement = ' '.join(current_statement)
-                if not statement.endswith(';'):
-                    statement += ';'
-                statements.append(statement)
-                continue
-
-            # Handle any other statement
-            if line:
-                if not line.endswith(';'):
-                    line += ';'
-                statements.append(line)
-            i += 1
-
+    def parse_cypher_statements(self, cypher_script: Union[str, TextIO]) -> List[str]:
+        """Parse a Cypher script, given as text or an open file, into individual statements"""
+        statements = list(iter_cypher_statements(cypher_script))
         logger.info(f"Parsed {len(statements)} statements")
         return statements
 
@@ -170,25 +297,127 @@ class AdvancedNeo4jBatchUploader:
 
         return True
 
-    def execute_with_retry(self, session, statement: str) -> bool:
-        """Execute a statement with retry logic"""
-        for attempt in range(self.retry_attempts):
+    def execute_with_retry(self, session, statement: str, parameters: Optional[Dict[str, Any]] = None,
+                           statement_count: int = 1) -> bool:
+        """
+        Execute a statement in autocommit mode, retrying transient errors.
+        statement_count is the number of script statements it stands for (UNWIND rows).
+        """
+        for attempt in range(max(self.retry_attempts, self.deadlock_retry_attempts, 1)):
             try:
-                session.run(statement)
+                start = time.perf_counter()
+                session.run(statement, parameters or {}).consume()
+                self.pace(time.perf_counter() - start, statement_count, _query_shape(statement, parameters))
                 return True
-            except Neo4jError as e:
-                if attempt < self.retry_attempts - 1:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Attempt {attempt + 1} failed. Retrying in {wait_time} seconds...")
+            except (Neo4jError, ServiceUnavailable, SessionExpired) as e:
+                wait_time = self.retry_delay(e, attempt)
+                if wait_time is not None:
+                    logger.warning(f"Attempt {attempt + 1} failed. Retrying in {wait_time:.2f} seconds...")
                     time.sleep(wait_time)
                 else:
-                    logger.error(f"Failed to execute statement after {self.retry_attempts} attempts: {str(e)}")
-                    logger.error(f"Statement: {statement}")
+                    logger.error(f"Failed to execute statement after {attempt + 1} attempts: {str(e)}")
+                    logger.error(f"Statement: {statement[:500]}")
                     return False
         return False
 
+    def execute_transaction(self, session, statements: List[tuple],
+                            statement_count: Optional[int] = None) -> Optional[Exception]:
+        """
+        Run (statement, parameters) pairs in one managed write transaction.
+
+        The whole transaction is retried with backoff on transient errors only.
+        statement_count is the number of script statements it stands for, by default
+        len(statements). Returns None on commit, otherwise the error that rolled it back.
+        """
+        def work(tx):
+            for statement, parameters in statements:
+                tx.run(statement, parameters or {}).consume()
+
+        last_error = None
+        for attempt in range(max(self.retry_attempts, self.deadlock_retry_attempts, 1)):
+            try:
+                start = time.perf_counter()
+                session.execute_write(work)
+                self.pace(time.perf_counter() - start, statement_count or len(statements),
+                          _query_shape(*statements[0]))
+                return None
+            except (Neo4jError, ServiceUnavailable, SessionExpired) as e:
+                last_error = e
+                wait_time = self.retry_delay(e, attempt)
+                if wait_time is None:
+                    if isinstance(e, RETRYABLE_ERRORS):
+                        logger.error(f"Transaction failed after {attempt + 1} attempts: {str(e)}")
+                    return e
+                logger.warning(f"Transaction of {len(statements)} statements hit a transient error, "
+                               f"retrying in {wait_time:.2f} seconds: {str(e)}")
+                time.sleep(wait_time)
+        # Every attempt was used up without a commit, so never report success here
+        logger.error(f"Transaction failed after exhausting its retries: {str(last_error)}")
+        return last_error
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after a failed attempt (0-based), None to give up"""
+        if not isinstance(error, RETRYABLE_ERRORS):
+            return None
+
+        deadlock = getattr(error, 'code', None) == DEADLOCK_CODE
+        with self.stats_lock:
+            self.counters['deadlocks' if deadlock else 'transient_errors'] += 1
+
+        if deadlock:
+            if attempt >= self.deadlock_retry_attempts - 1:
+                return None
+            # Jittered, so the transactions that collided do not collide again
+            return min(0.1 * 2 ** attempt, 5.0) * (0.5 + random.random())
+        if attempt >= self.retry_attempts - 1:
+            return None
+        return 2 ** attempt
+
+    def reset_counters(self):
+        """Zero the retry, pacing and relationship phase counters of generate_summary_report"""
+        self.counters = {
+            'transient_errors': 0,
+            'deadlocks': 0,
+            'pace_delay': 0.0,
+            'relationship_statements': 0,
+            'relationship_seconds': 0.0,
+            'relationship_workers': 1
+        }
+
+    def pace(self, latency: float, statement_count: int, shape: str = ""):
+        """
+        Wait while the server answers markedly slower than its best, instead of fixed sleeps.
+
+        Baseline and average are kept per query shape (see _query_shape): a
+        relationship row costs several times a node row on a healthy server, so a
+        shared baseline would slow down every phase after the cheapest one.
+        """
+        per_statement = latency / max(statement_count, 1)
+        with self.stats_lock:
+            stats = self.latency_stats.get(shape)
+            if stats is None:
+                stats = self.latency_stats[shape] = [per_statement, per_statement]
+            else:
+                stats[0] = min(stats[0], per_statement)
+                stats[1] = 0.8 * stats[1] + 0.2 * per_statement
+            baseline, average = stats
+
+            if average > baseline * self.pace_tolerance:
+                # Give the server about as long as this write took beyond its normal latency
+                delay = min(self.max_pace_delay, latency - baseline * statement_count)
+            else:
+                delay = 0
+            if delay > 0:
+                self.counters['pace_delay'] += delay
+
+        if delay > 0:
+            time.sleep(delay)
+
     def execute_batch(self, session, statements: List[str], batch_name: str = "") -> Dict[str, Any]:
         """Execute a batch of statements with progress tracking"""
+        if self.transaction_size > 0:
+            return self.execute_batch_transactional(session, statements, batch_name)
+
         results = {
             'success': 0,
             'failed': 0,
@@ -216,6 +445,50 @@ class AdvancedNeo4jBatchUploader:
 
         return results
 
+    def execute_batch_transactional(self, session, statements: List[str], batch_name: str = "") -> Dict[str, Any]:
+        """Execute a batch of statements committing transaction_size statements per transaction"""
+        results = {
+            'success': 0,
+            'failed': 0,
+            'errors': [],
+            'failed_statements': []
+        }
+
+        valid = []
+        for i, statement in enumerate(statements, 1):
+            if self.validate_statement(statement):
+                valid.append((i, statement))
+            else:
+                results['failed'] += 1
+                results['failed_statements'].append(statement)
+                results['errors'].append(f"Invalid statement {i}: {statement[:100]}...")
+
+        with tqdm(total=len(statements), desc=batch_name, unit="stmt") as pbar:
+            pbar.update(len(statements) - len(valid))
+            for start in range(0, len(valid), self.transaction_size):
+                chunk = valid[start:start + self.transaction_size]
+                error = self.execute_transaction(session, [(statement, None) for _, statement in chunk])
+                if error is not None and len(chunk) > 1:
+                    # One bad statement rolls back the whole transaction, commit the others one by one
+                    logger.warning(f"Transaction of {len(chunk)} statements rolled back, "
+                                   f"retrying them individually: {str(error)}")
+                    failures = [(i, statement) for i, statement in chunk
+                                if self.execute_transaction(session, [(statement, None)]) is not None]
+                elif error is not None:
+                    failures = chunk
+                else:
+                    failures = []
+
+                results['success'] += len(chunk) - len(failures)
+                results['failed'] += len(failures)
+                for i, statement in failures:
+                    results['failed_statements'].append(statement)
+                    results['errors'].append(f"Statement {i} failed: {statement[:100]}...")
+
+                pbar.update(len(chunk))
+
+        return results
+
     def create_indexes(self, session):
         """Create indexes for better performance"""
         index_statements = [
@@ -237,9 +510,10 @@ class AdvancedNeo4jBatchUploader:
             except Exception as e:
                 logger.warning(f"Failed to create index: {statement}, Error: {str(e)}")
 
-    def upload_cypher_script(self, cypher_script: str, create_backup: bool = True):
+    def upload_cypher_script(self, cypher_script: Union[str, TextIO], create_backup: bool = True):
         """Upload the Cypher script to Neo4j with enhanced features"""
         start_time = time.time()
+        self.reset_counters()
 
         # Create backup if requested
         if create_backup:
@@ -269,41 +543,32 @@ class AdvancedNeo4jBatchUploader:
                 logger.info("Executing DELETE statements...")
                 results = self.execute_batch(session, grouped_statements['delete'], "DELETE")
                 self.update_total_results(total_results, results)
-                session.run("CALL db.checkpoint()")
 
             # Process node creation statements
             node_statements = grouped_statements['nodes']
             if node_statements:
                 logger.info(f"Executing {len(node_statements)} node creation statements...")
-                for i in range(0, len(node_statements), self.batch_size):
-                    batch = node_statements[i:i + self.batch_size]
-                    batch_name = f"NODES batch {i // self.batch_size + 1}/{(len(node_statements) + self.batch_size - 1) // self.batch_size}"
+                size = self.statement_batch_size
+                for i in range(0, len(node_statements), size):
+                    batch = node_statements[i:i + size]
+                    batch_name = f"NODES batch {i // size + 1}/{(len(node_statements) + size - 1) // size}"
 
                     results = self.execute_batch(session, batch, batch_name)
                     self.update_total_results(total_results, results)
 
-                    # Periodic checkpoint
-                    if (i + self.batch_size) % (self.batch_size * 5) == 0:
-                        session.run("CALL db.checkpoint()")
-
-                    time.sleep(0.2)  # Small delay between batches
-
             # Process relationship creation statements
             rel_statements = grouped_statements['relationships']
             if rel_statements:
                 logger.info(f"Executing {len(rel_statements)} relationship creation statements...")
-                for i in range(0, len(rel_statements), self.batch_size):
-                    batch = rel_statements[i:i + self.batch_size]
-                    batch_name = f"RELATIONSHIPS batch {i // self.batch_size + 1}/{(len(rel_statements) + self.batch_size - 1) // self.batch_size}"
-
-                    results = self.execute_batch(session, batch, batch_name)
-                    self.update_total_results(total_results, results)
-
-                    # Periodic checkpoint
-                    if (i + self.batch_size) % (self.batch_size * 5) == 0:
-                        session.run("CALL db.checkpoint()")
+                partitions = {
+                    label: (len(statements), self.statement_task(statements, f"RELATIONSHIPS {label}"))
+                    for label, statements in self.partition_by_start_label(rel_statements).items()
+                }
+                results = self.run_relationship_phase(session, partitions)
+                self.update_total_results(total_results, results)
 
-                    time.sleep(0.2)  # Small delay between batches
+        # Let running agents drop cached schema and query results
+        self.bump_graph_version()
 
         # Generate summary report
         end_time = time.time()
@@ -316,6 +581,236 @@ class AdvancedNeo4jBatchUploader:
 
         return total_results
 
+    def upload_cypher_script_bulk(self, cypher_script: Union[str, TextIO], create_backup: bool = True):
+        """
+        Upload the Cypher script with parameterized UNWIND queries.
+
+        Node CREATEs are grouped by label and MATCH...MATCH...CREATE relationships by
+        (type, start label, end label), and every group is written with one
+        `UNWIND $rows` query per bulk_size rows instead of one round trip per statement.
+        Statements of any other shape run one by one as in upload_cypher_script.
+        """
+        start_time = time.time()
+        self.reset_counters()
+
+        if create_backup:
+            self.create_backup()
+
+        logger.info("Parsing Cypher statements...")
+        statements = self.parse_cypher_statements(cypher_script)
+        logger.info(f"Found {len(statements)} statements")
+
+        grouped_statements = self.group_statements_for_bulk(statements)
+
+        total_results = {
+            'success': 0,
+            'failed': 0,
+            'errors': [],
+            'failed_statements': []
+        }
+
+        with self.driver.session() as session:
+            self.create_indexes(session)
+
+            if grouped_statements['delete']:
+                logger.info("Executing DELETE statements...")
+                results = self.execute_batch(session, grouped_statements['delete'], "DELETE")
+                self.update_total_results(total_results, results)
+
+            # Nodes before relationships, the relationship MATCHes depend on them
+            for label, entries in grouped_statements['nodes'].items():
+                query = f"UNWIND $rows AS row CREATE (n:`{label}`) SET n = row"
+                results = self.execute_bulk(session, query, entries, f"NODES {label}")
+                self.update_total_results(total_results, results)
+
+            if grouped_statements['fallback_nodes']:
+                results = self.execute_batch(session, grouped_statements['fallback_nodes'], "NODES (statement)")
+                self.update_total_results(total_results, results)
+
+            groups_by_label = {}
+            for key, entries in grouped_statements['relationships'].items():
+                groups_by_label.setdefault(key[1], {})[key] = entries
+            partitions = {
+                label: (sum(len(entries) for entries in groups.values()), self.bulk_relationship_task(groups))
+                for label, groups in groups_by_label.items()
+            }
+            fallback = self.partition_by_start_label(grouped_statements['fallback_relationships'])
+            for label, statements in fallback.items():
+                partitions[f"{label} (statement)"] = (
+                    len(statements), self.statement_task(statements, f"RELATIONSHIPS {label} (statement)")
+                )
+            if partitions:
+                results = self.run_relationship_phase(session, partitions)
+                self.update_total_results(total_results, results)
+
+        self.bump_graph_version()
+
+        duration = time.time() - start_time
+        self.generate_summary_report(total_results, duration)
+
+        if total_results['failed_statements']:
+            self.save_failed_statements(total_results['failed_statements'])
+
+        return total_results
+
+    def partition_by_start_label(self, statements: List[str]) -> Dict[str, List[str]]:
+        """Relationship statements by the label of their start node, 'unknown' if it cannot be read"""
+        partitions = {}
+        for statement in statements:
+            match = _RELATIONSHIP_PATTERN.match(statement)
+            label = 'unknown'
+            if match:
+                first_var, first_label, _, second_var, second_label, _, start_var, _, _ = match.groups()
+                label = first_label if start_var == first_var else second_label if start_var == second_var else label
+            partitions.setdefault(label, []).append(statement)
+        return partitions
+
+    def statement_task(self, statements: List[str], batch_name: str):
+        """Relationship phase task running statements in statement_batch_size batches on the session it is given"""
+        def run(session):
+            total_results = {'success': 0, 'failed': 0, 'errors': [], 'failed_statements': []}
+            size = self.statement_batch_size
+            batch_count = (len(statements) + size - 1) // size
+            for i in range(0, len(statements), size):
+                batch = statements[i:i + size]
+                results = self.execute_batch(session, batch, f"{batch_name} batch {i // size + 1}/{batch_count}")
+                self.update_total_results(total_results, results)
+            return total_results
+        return run
+
+    def bulk_relationship_task(self, groups: Dict[tuple, List[tuple]]):
+        """Relationship phase task running the UNWIND queries of (type, start label, end label) groups"""
+        def run(session):
+            total_results = {'success': 0, 'failed': 0, 'errors': [], 'failed_statements': []}
+            for (rel_type, start_label, end_label), entries in groups.items():
+                query = f'''
+                UNWIND $rows AS row
+                MATCH (a:`{start_label}` {{name: row.start}})
+                MATCH (b:`{end_label}` {{name: row.end}})
+                CREATE (a)-[:`{rel_type}`]->(b)
+                '''
+                results = self.execute_bulk(session, query, entries, f"{rel_type} {start_label}->{end_label}")
+                self.update_total_results(total_results, results)
+            return total_results
+        return run
+
+    def run_relationship_phase(self, session, partitions: Dict[str, tuple]) -> Dict[str, Any]:
+        """
+        Run one (statement count, task) partition per start-node label, on
+        relationship_workers sessions in parallel.
+
+        Tasks for different start labels lock mostly different nodes, so they rarely
+        conflict; the deadlocks that do happen are retried by execute_transaction /
+        execute_with_retry. New sessions start from the bookmarks of `session`, so they
+        see the nodes it created.
+        """
+        total_results = {'success': 0, 'failed': 0, 'errors': [], 'failed_statements': []}
+        start = time.perf_counter()
+        workers = min(self.relationship_workers, len(partitions))
+
+        if workers > 1:
+            bookmarks = session.last_bookmarks()
+
+            def run(task):
+                with self.driver.session(bookmarks=bookmarks) as worker_session:
+                    return task(worker_session)
+
+            logger.info(f"Loading relationships of {len(partitions)} start labels on {workers} sessions")
+            # Largest partitions first, so no worker is left with a big one at the end
+            tasks = [task for _, task in sorted(partitions.values(), key=lambda partition: -partition[0])]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for results in executor.map(run, tasks):
+                    self.update_total_results(total_results, results)
+        else:
+            for _, task in partitions.values():
+                self.update_total_results(total_results, task(session))
+
+        with self.stats_lock:
+            self.counters['relationship_statements'] += total_results['success'] + total_results['failed']
+            self.counters['relationship_seconds'] += time.perf_counter() - start
+            self.counters['relationship_workers'] = max(workers, 1)
+        return total_results
+
+    def group_statements_for_bulk(self, statements: List[str]) -> Dict[str, Any]:
+        """
+        Turn node and relationship statements into parameter rows for upload_cypher_script_bulk.
+
+        Rows are kept as (statement, row) pairs so a failed UNWIND can still report the
+        original statements. Statements that do not fit the two bulk shapes are returned
+        under fallback_nodes / fallback_relationships unchanged.
+        """
+        grouped = self.group_statements_by_type(statements)
+        bulk = {
+            'delete': grouped['delete'],
+            'nodes': {},
+            'relationships': {},
+            'fallback_nodes': [],
+            'fallback_relationships': []
+        }
+
+        for statement in grouped['nodes']:
+            match = _NODE_PATTERN.match(statement)
+            properties = _parse_property_map(match.group(2)) if match else None
+            if properties is None:
+                bulk['fallback_nodes'].append(statement)
+                continue
+            bulk['nodes'].setdefault(match.group(1), []).append((statement, properties))
+
+        for statement in grouped['relationships']:
+            match = _RELATIONSHIP_PATTERN.match(statement)
+            parsed = _relationship_row(match) if match else None
+            if parsed is None:
+                bulk['fallback_relationships'].append(statement)
+                continue
+            key, row = parsed
+            bulk['relationships'].setdefault(key, []).append((statement, row))
+
+        logger.info(f"Bulk groups - Node labels: {len(bulk['nodes'])}, "
+                    f"Relationship groups: {len(bulk['relationships'])}, "
+                    f"Statement fallback: {len(bulk['fallback_nodes']) + len(bulk['fallback_relationships'])}, "
+                    f"Skipped other: {len(grouped['other'])}")
+
+        return bulk
+
+    def execute_bulk(self, session, query: str, entries: List[tuple], batch_name: str = "") -> Dict[str, Any]:
+        """Run an UNWIND query over (statement, row) entries in chunks of bulk_size rows"""
+        results = {
+            'success': 0,
+            'failed': 0,
+            'errors': [],
+            'failed_statements': []
+        }
+
+        with tqdm(total=len(entries), desc=batch_name, unit="stmt") as pbar:
+            for i in range(0, len(entries), self.bulk_size):
+                chunk = entries[i:i + self.bulk_size]
+                parameters = {'rows': [row for _, row in chunk]}
+                if self.transaction_size > 0:
+                    succeeded = self.execute_transaction(session, [(query, parameters)], len(chunk)) is None
+                else:
+                    succeeded = self.execute_with_retry(session, query, parameters, len(chunk))
+                if succeeded:
+                    results['success'] += len(chunk)
+                else:
+                    results['failed'] += len(chunk)
+                    results['failed_statements'].extend(statement for statement, _ in chunk)
+                    results['errors'].append(f"{batch_name} rows {i + 1}-{i + len(chunk)} failed")
+
+                pbar.update(len(chunk))
+
+        return results
+
+    def bump_graph_version(self):
+        """Advance the graph version marker read by data/knowledgegraph.get_graph_version"""
+        # Imported here, data.knowledgegraph pulls in langchain and is only needed after an upload
+        from data.knowledgegraph import bump_graph_version
+
+        try:
+            # The uploader's sessions use the default database, so does the marker
+            bump_graph_version(self.driver, None)
+        except Exception as e:
+            logger.warning(f"Failed to bump graph version: {str(e)}")
+
     def group_statements_by_type(self, statements: List[str]) -> Dict[str, List[str]]:
         """Group statements by type for better organization (updated for fixed format)"""
         groups = {
@@ -423,6 +918,11 @@ Total statements processed: {results['success'] + results['failed']}
 Successful: {results['success']}
 Failed: {results['failed']}
 Success rate: {(results['success'] / (results['success'] + results['failed']) * 100):.2f}%
+Throughput: {(results['success'] + results['failed']) / duration:.1f} statements/sec
+Pacing delay: {self.counters['pace_delay']:.2f} seconds
+Transient errors: {self.counters['transient_errors']}
+Deadlocks: {self.counters['deadlocks']}
+{self.relationship_phase_summary()}
 
 """
         if results['errors']:
@@ -442,6 +942,15 @@ Success rate: {(results['success'] / (results['success'] + results['failed']) *
 
         logger.info(f"Detailed report saved to: {report_file}")
 
+    def relationship_phase_summary(self) -> str:
+        """Throughput line of the relationship phase for generate_summary_report"""
+        statements = self.counters['relationship_statements']
+        seconds = self.counters['relationship_seconds']
+        if not statements or not seconds:
+            return "Relationship phase: not run"
+        return (f"Relationship phase: {statements} statements in {seconds:.2f} seconds "
+                f"({statements / seconds:.1f} statements/sec on {self.counters['relationship_workers']} sessions)")
+
     def save_failed_statements(self, failed_statements: List[str]):
         """Save failed statements to a file for review"""
         filename = f'failed_statements_{datetime.now().strftime("%Y%m%d_%H%M%S")}.cypher'
@@ -454,19 +963,32 @@ Success rate: {(results['success'] / (results['success'] + results['failed']) *
 
 # Example usage
 if __name__ == "__main__":
+    # Configure logging, only when run as a script so importers keep their own handlers
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(f'neo4j_upload_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
+            logging.StreamHandler()
+        ]
+    )
+
     # Configuration
     NEO4J_URI = "bolt://localhost:7687"  # Update with your URI
     NEO4J_USERNAME = "neo4j"  # Update with your username
     NEO4J_PASSWORD = "Moni8913bca3"  # Update with your password
     BATCH_SIZE = 50
     RETRY_ATTEMPTS = 3
+    BULK_SIZE = 1000
+    TRANSACTION_SIZE = 200  # Statements per managed transaction, 0 for autocommit per statement
+    RELATIONSHIP_WORKERS = 4  # Parallel sessions for the relationship phase
+    USE_BULK_LOADER = True  # UNWIND parameter rows instead of one statement per round trip
 
-    # Read the Cypher script from file
-    try:
-        with open('bev_cypher_script_fixed.cypher', 'r', encoding='utf-8') as file:
-            cypher_script = file.read()
-    except FileNotFoundError:
-        logger.error("Cypher script file not found. Please ensure 'bev_cypher_script_fixed.cypher' exists.")
+    CYPHER_FILE = 'bev_cypher_script_fixed.cypher'
+
+    # The script is read in chunks while it is parsed
+    if not os.path.exists(CYPHER_FILE):
+        logger.error(f"Cypher script file not found. Please ensure '{CYPHER_FILE}' exists.")
         exit(1)
 
     # Create uploader instance
@@ -475,12 +997,19 @@ if __name__ == "__main__":
         NEO4J_USERNAME,
         NEO4J_PASSWORD,
         batch_size=BATCH_SIZE,
-        retry_attempts=RETRY_ATTEMPTS
+        retry_attempts=RETRY_ATTEMPTS,
+        bulk_size=BULK_SIZE,
+        transaction_size=TRANSACTION_SIZE,
+        relationship_workers=RELATIONSHIP_WORKERS
     )
 
     try:
         # Upload the script with backup
-        uploader.upload_cypher_script(cypher_script, create_backup=True)
+        with open(CYPHER_FILE, 'r', encoding='utf-8') as cypher_script:
+            if USE_BULK_LOADER:
+                uploader.upload_cypher_script_bulk(cypher_script, create_backup=True)
+            else:
+                uploader.upload_cypher_script(cypher_script, create_backup=True)
     except Exception as e:
         logger.error(f"Upload failed: {str(e)}")
     finally:
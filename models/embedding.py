@@ -1,5 +1,13 @@
 from utils.utils import load_config
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Any, Optional
+import numpy as np
 import logging
+import os
+import sqlite3
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -7,23 +15,230 @@ logger = logging.getLogger(__name__)
 config = load_config()
 embedding_config = config.get("embedding", {})
 dimension = embedding_config.get("dimension", {})
+cache_config = embedding_config.get("cache", {})
 
 # Initialize the embedding model based on configuration
 provider = embedding_config.get("provider", "sentence_transformers")
 model_name = embedding_config.get("model", "all-MiniLM-L6-v2")
+# ONNX file inside the model repository, e.g. "onnx/model_qint8_avx2.onnx" for the int8 export
+onnx_file = embedding_config.get("onnx_file")
 
-logger.info(f"Initializing embedding model: {provider}/{model_name}")
+# CPU inference backends. All of them return the same SentenceTransformer interface,
+# so the cache, the Embeddings wrapper and callers of encode() are unaffected.
+#   sentence_transformers  PyTorch float32 model
+#   onnx                   ONNX Runtime, needs optimum[onnxruntime]; with onnx_file a quantized export
+#   torch_int8             PyTorch with linear layers dynamically quantized to int8
+EMBEDDING_PROVIDERS = ("sentence_transformers", "onnx", "torch_int8")
 
-if provider == "sentence_transformers":
+
+def load_embedding_model(provider: str, model_name: str, onnx_file: Optional[str] = None):
+    """Create a SentenceTransformer for one of EMBEDDING_PROVIDERS"""
+    # Imported on first load, torch and transformers alone take seconds to import
     from sentence_transformers import SentenceTransformer
 
-    embedding_model = SentenceTransformer(model_name)
+    start = time.perf_counter()
+    if provider == "sentence_transformers":
+        model = SentenceTransformer(model_name)
+
+    elif provider == "onnx":
+        model_kwargs = {"file_name": onnx_file} if onnx_file else None
+        try:
+            model = SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+        except ImportError:
+            logger.error("The onnx embedding provider requires: pip install optimum[onnxruntime]")
+            raise
+
+    elif provider == "torch_int8":
+        import torch
+
+        model = SentenceTransformer(model_name, device="cpu")
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    else:
+        raise ValueError(f"Unsupported embedding provider: {provider}")
+
+    logger.info(f"Loaded embedding model {provider}/{model_name} in {time.perf_counter() - start:.2f}s")
+    return model
+
+
+def _load_configured_model():
+    return load_embedding_model(provider, model_name, onnx_file)
+
+
+# The model itself is only loaded on first use, see CachedEmbeddingModel.model
+if provider in EMBEDDING_PROVIDERS:
+    model_loader = _load_configured_model
 
 else:
     logger.error(f"Unsupported embedding provider: {provider}")
     raise ValueError(f"Unsupported embedding provider: {provider}")
 
 
+def embedding_model_id(provider: str, model_name: str, onnx_file: Optional[str] = None) -> str:
+    # Backends produce slightly different vectors, so they must not share cache entries
+    return model_name if provider == "sentence_transformers" else f"{model_name}@{provider}:{onnx_file or ''}"
+
+
+model_id = embedding_model_id(provider, model_name, onnx_file)
+
+
+class EmbeddingCache:
+    """Bounded, thread-safe LRU cache of embeddings with an optional SQLite tier on disk"""
+
+    def __init__(self, max_entries: int = 1024, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if persist_path:
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Embedding cache persisted to {persist_path}")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._store(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        with self._lock:
+            self._store(key, vector)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", (key, vector.tobytes())
+                )
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: str, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CachedEmbeddingModel:
+    """
+    Drop-in wrapper around a SentenceTransformer whose encode() goes through the cache.
+
+    The model is created by `model_loader` on first access, so importing this module
+    does not pay for loading it.
+    """
+
+    # encode() options that do not change the resulting vectors
+    _PASSTHROUGH_OPTIONS = {"batch_size", "show_progress_bar"}
+
+    def __init__(self, model_loader, model_name: str, cache: EmbeddingCache):
+        self.model_loader = model_loader
+        self.model_name = model_name
+        self.cache = cache
+        self.lowercase_keys = False
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    model = self.model_loader()
+                    # Uncased models embed "Motor" and "motor" identically, so their keys can be case-folded
+                    tokenizer = getattr(model, "tokenizer", None)
+                    self.lowercase_keys = bool(getattr(tokenizer, "do_lower_case", False))
+                    self._model = model
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def cache_key(self, text: str, normalize_embeddings: bool) -> str:
+        normalized = " ".join(text.split())
+        if self.lowercase_keys:
+            normalized = normalized.lower()
+        return f"{self.model_name}\x1f{int(normalize_embeddings)}\x1f{normalized}"
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **kwargs):
+        # Anything that changes the output format (tensors, precision, ...) bypasses the cache
+        if set(kwargs) - self._PASSTHROUGH_OPTIONS or not sentences:
+            return self.model.encode(sentences, normalize_embeddings=normalize_embeddings, **kwargs)
+
+        # Key normalization depends on the tokenizer, so the model has to be loaded first
+        self.model
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [self.cache_key(text, normalize_embeddings) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = self.model.encode(
+                [texts[i] for i in missing], normalize_embeddings=normalize_embeddings, **kwargs
+            )
+            for i, vector in zip(missing, encoded):
+                self.cache.put(keys[i], vector)
+                vectors[i] = vector
+
+        result = np.array(vectors, dtype=np.float32)
+        return result[0] if single else result
+
+    def __getattr__(self, name):
+        # Private attributes are never delegated, they may be looked up before __init__ ran
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+
+embedding_cache = EmbeddingCache(
+    max_entries=cache_config.get("max_entries", 1024),
+    persist_path=cache_config.get("persist_path"),
+)
+embedding_model = CachedEmbeddingModel(model_loader, model_id, embedding_cache)
+
+
 # Create a wrapper class to adapt embedding model to LangChain's expected interface
 class Embeddings:
     def __init__(self, model, normalize_embeddings=True):
@@ -51,11 +266,128 @@ class Embeddings:
 embeddings_wrapper = Embeddings(embedding_model)
 
 
+# --- Versioned embedding sets ---
+#
+# An embedding set is one generation of node embeddings: a model plus the node
+# properties and vector indexes it is stored under. Set "v2" lives in
+# description_embedding_v2 / nodeDescription_v2; no version is the original
+# unsuffixed set. utils/create_embeddings.py and utils/create_vectorindex.py build
+# a set next to the live one, utils/switch_embedding_set.py makes it live by
+# rewriting embedding.version in config.json.
+
+def get_embedding_set(version: Optional[str] = None, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Model and storage names of an embedding set, with per-set overrides from embedding.sets.<version>"""
+    settings = settings if settings is not None else config
+    embedding_settings = settings.get("embedding", {})
+    index_settings = settings.get("vector_index", {})
+    overrides = embedding_settings.get("sets", {}).get(version, {}) if version else {}
+    suffix = f"_{version}" if version else ""
+    set_provider = overrides.get("provider", embedding_settings.get("provider", "sentence_transformers"))
+    set_model = overrides.get("model", embedding_settings.get("model", "all-MiniLM-L6-v2"))
+    set_onnx_file = overrides.get("onnx_file", embedding_settings.get("onnx_file"))
+
+    return {
+        "version": version,
+        "provider": set_provider,
+        "model": set_model,
+        "onnx_file": set_onnx_file,
+        # Stored with every embedding: a provider or ONNX file change re-embeds like a model change
+        "model_id": embedding_model_id(set_provider, set_model, set_onnx_file),
+        "dimension": overrides.get("dimension", embedding_settings.get("dimension", 384)),
+        "property": index_settings.get("property", "description_embedding") + suffix,
+        "index_name": index_settings.get("name", "nodeDescription") + suffix,
+        "hash_property": f"embedding_hash{suffix}",
+        "model_property": f"embedding_model{suffix}",
+        "updated_property": f"embedding_updated_at{suffix}",
+    }
+
+
+_live_set = None
+_live_set_mtime = None
+_live_set_lock = threading.Lock()
+
+
+def get_live_embedding_set() -> Dict[str, Any]:
+    """
+    The embedding set searches read, named by embedding.version in config.json.
+
+    config.json is re-read whenever its modification time changes, so a switchover
+    takes effect in running processes on their next search without a restart.
+    """
+    global _live_set, _live_set_mtime
+    try:
+        mtime = os.path.getmtime("config.json")
+    except OSError:
+        mtime = None
+
+    with _live_set_lock:
+        if _live_set is None or mtime != _live_set_mtime:
+            settings = load_config() if mtime is not None else config
+            live_set = get_embedding_set(settings.get("embedding", {}).get("version"), settings)
+            if _live_set is not None and live_set["version"] != _live_set["version"]:
+                logger.info(f"Live embedding set switched from {_live_set['version']} to {live_set['version']}")
+            _live_set = live_set
+            _live_set_mtime = mtime
+        return _live_set
+
+
+_set_models = {}
+_set_models_lock = threading.Lock()
+
+
 # Function to get the embedding model directly
-def get_embedding_model():
-    return embedding_model
+def get_embedding_model(embedding_set: Optional[Dict[str, Any]] = None):
+    """The configured embedding model, or the query model of an embedding set"""
+    if embedding_set is None:
+        return embedding_model
+
+    set_model_id = embedding_set["model_id"]
+    if set_model_id == embedding_model.model_name:
+        return embedding_model
+
+    with _set_models_lock:
+        if set_model_id not in _set_models:
+            loader = partial(load_embedding_model, embedding_set["provider"], embedding_set["model"],
+                             embedding_set["onnx_file"])
+            _set_models[set_model_id] = CachedEmbeddingModel(loader, set_model_id, embedding_cache)
+        return _set_models[set_model_id]
 
 
 # Function to get the wrapped embedding model
 def get_embeddings():
-    return embeddings_wrapper
\ No newline at end of file
+    return embeddings_wrapper
+
+
+# Function to inspect query embedding cache statistics
+def get_embedding_cache():
+    return embedding_cache
+
+
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+
+
+def start_embedding_warm_up() -> Optional[threading.Thread]:
+    """
+    Load the embedding model in a background thread if embedding.warm_up is enabled.
+
+    Safe to call repeatedly (Streamlit reruns its script on every interaction); the
+    thread is only started once. Returns the warm-up thread, or None when disabled.
+    """
+    global _warm_up_thread
+    if not embedding_config.get("warm_up", True):
+        return None
+
+    with _warm_up_lock:
+        live_model = get_embedding_model(get_live_embedding_set())
+        if _warm_up_thread is None and not live_model.is_loaded:
+            def warm_up():
+                try:
+                    # One encode also initializes the tokenizer and inference kernels
+                    live_model.model.encode("warm up")
+                except Exception as e:
+                    logger.error(f"Embedding model warm-up failed: {str(e)}")
+
+            _warm_up_thread = threading.Thread(target=warm_up, name="embedding-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
@@ -0,0 +1,11 @@
+# tests/conftest.py
+import os
+import sys
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# config.json is read relative to the working directory, see utils.utils.load_config
+os.chdir(PROJECT_ROOT)
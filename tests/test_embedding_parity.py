@@ -0,0 +1,81 @@
+# tests/test_embedding_parity.py
+"""
+Parity of the CPU embedding providers with the float32 PyTorch model, the check
+benchmarks/bench_embedding_backends.py reports: every node description of
+data/bev.cypher must keep its direction (cosine similarity) and the top 5
+descriptions retrieved for a set of questions must stay the same (recall@5).
+A backend whose packages are not installed is skipped.
+"""
+import os
+import re
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from models.embedding import load_embedding_model
+from utils.utils import load_config
+
+config = load_config()
+embedding_config = config.get("embedding", {})
+model_name = embedding_config.get("model", "all-MiniLM-L6-v2")
+batch_size = embedding_config.get("batch_size", 32)
+
+CYPHER_FILE = os.path.join("data", "bev.cypher")
+# (provider, onnx_file, module the provider needs)
+BACKENDS = [
+    ("torch_int8", None, "torch"),
+    ("onnx", None, "optimum.onnxruntime"),
+    ("onnx", "onnx/model_qint8_avx2.onnx", "optimum.onnxruntime"),
+]
+QUESTIONS = [
+    "design requirements for components in the thermal management solution",
+    "Which functional requirements must the UserAuthentication function satisfy?",
+    "What are the inputs of the VehicleDynamicsModel?",
+    "Which performance requirements does the battery solution have to meet?",
+    "List all attributes of the BatteryPack product",
+    "charging power of the onboard charger",
+    "range of the vehicle on one battery charge",
+    "cooling of the electric motor",
+]
+MIN_COSINE = 0.98
+MIN_RECALL = 0.9
+RECALL_K = 5
+
+_DESCRIPTION_PATTERN = re.compile(r"description:\s*'((?:[^'\\]|\\.)*)'")
+
+
+def encode(model, texts):
+    return np.asarray(model.encode(texts, batch_size=batch_size, normalize_embeddings=True), dtype=np.float32)
+
+
+@pytest.fixture(scope="module")
+def texts():
+    with open(CYPHER_FILE, "r", encoding="utf-8") as file:
+        return sorted(set(_DESCRIPTION_PATTERN.findall(file.read())))
+
+
+@pytest.fixture(scope="module")
+def reference(texts):
+    model = load_embedding_model("sentence_transformers", model_name)
+    return encode(model, texts), encode(model, QUESTIONS)
+
+
+@pytest.mark.parametrize("provider, onnx_file, module", BACKENDS,
+                         ids=[f"{provider}-{onnx_file or 'default'}" for provider, onnx_file, _ in BACKENDS])
+def test_backend_matches_float_model(provider, onnx_file, module, texts, reference):
+    pytest.importorskip(module)
+    model = load_embedding_model(provider, model_name, onnx_file)
+    corpus, queries = encode(model, texts), encode(model, QUESTIONS)
+    reference_corpus, reference_queries = reference
+
+    cosines = np.sum(corpus * reference_corpus, axis=1)
+    assert cosines.min() >= MIN_COSINE, f"lowest cosine similarity {cosines.min():.4f}"
+
+    hits = []
+    for i in range(len(QUESTIONS)):
+        expected = set(np.argsort(-(reference_corpus @ reference_queries[i]))[:RECALL_K])
+        retrieved = set(np.argsort(-(corpus @ queries[i]))[:RECALL_K])
+        hits.append(len(expected & retrieved) / RECALL_K)
+    assert np.mean(hits) >= MIN_RECALL, f"recall@{RECALL_K} {np.mean(hits):.2f}"
@@ -0,0 +1,156 @@
+# tests/test_upload_to_neo4j.py
+import io
+import os
+
+import pytest
+
+pytest.importorskip("neo4j")
+pytest.importorskip("tqdm")
+
+from data.upload_to_neo4j import (
+    AdvancedNeo4jBatchUploader, _LITERAL_PATTERN, _parse_property_map, _split_script, iter_cypher_statements
+)
+
+CYPHER_FILE = os.path.join("data", "bev.cypher")
+CHUNK_SIZES = [1, 2, 3, 7, 64, 1 << 16]
+
+SCRIPT = """// header; comment
+MATCH (n) DETACH DELETE n;
+CREATE (a:function {name: 'A;B', description: "x; y"}); /* block; comment */
+MATCH (a:function {name: 'A;B'}) // trailing; comment
+MATCH (b:`odd;label` {name: 'It\\'s; here'})
+CREATE (a)-[:CALLS]->(b);
+"""
+SCRIPT_STATEMENTS = [
+    "MATCH (n) DETACH DELETE n;",
+    """CREATE (a:function {name: 'A;B', description: "x; y"});""",
+    "MATCH (a:function {name: 'A;B'}) MATCH (b:`odd;label` {name: 'It\\'s; here'}) CREATE (a)-[:CALLS]->(b);",
+]
+
+
+@pytest.fixture
+def uploader():
+    # Grouping statements needs no database, so skip __init__ and its connection attempt
+    return AdvancedNeo4jBatchUploader.__new__(AdvancedNeo4jBatchUploader)
+
+
+def test_property_map_with_string_values():
+    assert _parse_property_map("name: 'BatteryPack', label: 'Battery Pack'") == {
+        'name': 'BatteryPack', 'label': 'Battery Pack'
+    }
+
+
+def test_property_map_across_lines_with_trailing_comma():
+    body = "\n    name: 'CurbWeight',\n    description: 'At most 2,000 kg',\n"
+    assert _parse_property_map(body) == {'name': 'CurbWeight', 'description': 'At most 2,000 kg'}
+
+
+def test_property_map_unescapes_strings():
+    body = r"name: 'Driver\'s Seat', description: 'first\nsecond \\ third'"
+    assert _parse_property_map(body) == {'name': "Driver's Seat", 'description': 'first\nsecond \\ third'}
+
+
+def test_property_map_keeps_syntax_inside_strings():
+    assert _parse_property_map("description: 'a, b: {c}; d'") == {'description': 'a, b: {c}; d'}
+
+
+@pytest.mark.parametrize("body", [
+    "name: 'Motor', specs: {power: '150 kW'}",
+    "name: 'Motor', power: 150",
+    'name: "Motor"',
+    "name: 'Motor' description: 'missing comma'",
+    "name: 'unterminated",
+])
+def test_property_map_falls_back_on_other_values(body):
+    assert _parse_property_map(body) is None
+
+
+def test_group_statements_for_bulk(uploader):
+    delete = "MATCH (n) DETACH DELETE n;"
+    motor = "CREATE (p_motor:product {name: 'ElectricDriveMotor', label: 'Electric Drive Motor'});"
+    seat = r"CREATE (p_seat:product {name: 'Driver\'s Seat'});"
+    nested = "CREATE (p_pack:product {name: 'BatteryPack', specs: {capacity: '75 kWh'}});"
+    solution = "CREATE (sol_adas:solution {name: 'ADAS'});"
+    forward = ("MATCH (p_motor:product {name: 'ElectricDriveMotor'})\n"
+               "MATCH (sol_adas:solution {name: 'ADAS'})\n"
+               "CREATE (p_motor)-[:REALIZES]->(sol_adas);")
+    reverse = ("MATCH (sol_adas:solution {name: 'ADAS'}) "
+               r"MATCH (p_seat:product {name: 'Driver\'s Seat'}) "
+               "CREATE (p_seat)-[:REALIZES]->(sol_adas);")
+    comma = ("MATCH (a:product {name: 'ElectricDriveMotor'}), (b:product {name: 'BatteryPack'}) "
+             "CREATE (a)-[:IS_COMPOSED_OF]->(b);")
+
+    bulk = uploader.group_statements_for_bulk([delete, motor, seat, nested, solution, forward, reverse, comma])
+
+    assert bulk['delete'] == [delete]
+    assert bulk['nodes'] == {
+        'product': [
+            (motor, {'name': 'ElectricDriveMotor', 'label': 'Electric Drive Motor'}),
+            (seat, {'name': "Driver's Seat"}),
+        ],
+        'solution': [(solution, {'name': 'ADAS'})],
+    }
+    assert bulk['relationships'] == {
+        ('REALIZES', 'product', 'solution'): [
+            (forward, {'start': 'ElectricDriveMotor', 'end': 'ADAS'}),
+            (reverse, {'start': "Driver's Seat", 'end': 'ADAS'}),
+        ],
+    }
+    assert bulk['fallback_nodes'] == [nested]
+    assert bulk['fallback_relationships'] == [comma]
+
+
+def test_group_statements_for_bulk_falls_back_on_unknown_variables(uploader):
+    statement = ("MATCH (a:product {name: 'A'}) MATCH (b:product {name: 'B'}) "
+                 "CREATE (a)-[:IS_COMPOSED_OF]->(c);")
+    bulk = uploader.group_statements_for_bulk([statement])
+    assert bulk['relationships'] == {}
+    assert bulk['fallback_relationships'] == [statement]
+
+
+def test_statements_ignore_semicolons_in_literals_and_comments():
+    assert list(iter_cypher_statements(SCRIPT)) == SCRIPT_STATEMENTS
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_statements_split_across_chunks(chunk_size):
+    assert list(iter_cypher_statements(io.StringIO(SCRIPT), chunk_size)) == SCRIPT_STATEMENTS
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_split_script_never_cuts_literals(chunk_size):
+    pieces = list(_split_script(io.StringIO(SCRIPT), chunk_size))
+    assert "".join(text for _, text in pieces) == SCRIPT
+    literals = [text for is_literal, text in pieces if is_literal]
+    assert literals == _LITERAL_PATTERN.findall(SCRIPT)
+
+
+def test_create_statements_without_semicolons():
+    script = ("CREATE (a:x {\n  name: 'A'\n})\n"
+              "CREATE (b:x {name: 'B'})\n"
+              "MATCH (a:x {name: 'A'})\n"
+              "MATCH (b:x {name: 'B'})\n"
+              "CREATE (a)-[:R]->(b)")
+    assert list(iter_cypher_statements(script)) == [
+        "CREATE (a:x { name: 'A' });",
+        "CREATE (b:x {name: 'B'});",
+        "MATCH (a:x {name: 'A'}) MATCH (b:x {name: 'B'}) CREATE (a)-[:R]->(b);",
+    ]
+
+
+def test_script_without_trailing_semicolon():
+    assert list(iter_cypher_statements("MATCH (n)\nRETURN n")) == ["MATCH (n) RETURN n;"]
+
+
+def test_semicolon_inside_call_subquery():
+    script = "CALL {\n  MATCH (n) RETURN n;\n}\nRETURN 1;"
+    assert list(iter_cypher_statements(script)) == ["CALL { MATCH (n) RETURN n; } RETURN 1;"]
+
+
+@pytest.mark.parametrize("chunk_size", [64, 4096])
+def test_bev_script_streamed_in_chunks(chunk_size):
+    with open(CYPHER_FILE, "r", encoding="utf-8") as cypher_file:
+        expected = list(iter_cypher_statements(cypher_file.read()))
+    with open(CYPHER_FILE, "r", encoding="utf-8") as cypher_file:
+        assert list(iter_cypher_statements(cypher_file, chunk_size)) == expected
+    assert all(statement.endswith(";") for statement in expected)
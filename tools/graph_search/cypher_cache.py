@@ -0,0 +1,94 @@
+# tools/graph_search/cypher_cache.py
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from utils.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+# Get the configuration
+config = load_config()
+cypher_cache_config = config.get("rag", {}).get("cypher_cache", {})
+
+
+def cypher_cache_key(query: str, semantic_results: List[Dict[str, Any]]) -> str:
+    """Key on the normalized question plus the set of semantic hit names the Cypher was generated from"""
+    normalized = " ".join(query.lower().split()).rstrip("?!. ")
+    normalized = re.sub(r"[\"'`]", "", normalized)
+    names = sorted({str(result.get("name")) for result in semantic_results if result.get("name")})
+    return f"{normalized}\x1f{'|'.join(names)}"
+
+
+class CypherCache:
+    """
+    LRU cache of LLM-generated Cypher with per-entry TTL.
+
+    Every entry records the graph version it was generated against. When a lookup
+    sees a newer graph version the whole cache is dropped, since Cypher written for
+    an older schema may no longer match.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str, graph_version) -> Optional[str]:
+        with self._lock:
+            self._check_version(graph_version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                cypher, created_at = entry
+                if time.time() - created_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cypher
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, graph_version, cypher: str):
+        with self._lock:
+            self._check_version(graph_version)
+            self._entries[key] = (cypher, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one entry, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _check_version(self, graph_version):
+        if graph_version != self._version:
+            if self._entries:
+                logger.info(f"Graph version changed to {graph_version}, dropping {len(self._entries)} cached Cypher queries")
+            self._entries.clear()
+            self._version = graph_version
+
+
+cypher_cache = CypherCache(
+    max_entries=cypher_cache_config.get("max_entries", 256),
+    ttl=cypher_cache_config.get("ttl", 3600),
+)
+
+
+def get_cypher_cache() -> CypherCache:
+    return cypher_cache
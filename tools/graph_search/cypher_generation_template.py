@@ -1,24 +1,27 @@
 
-# Template for Cypher generation with semantic search results
-CYPHER_GENERATION_TEMPLATE = """
+# Prompt text shared by both Cypher generation templates, up to the opening of the examples block
+_CYPHER_PROMPT_HEADER = """
 Your goal is to answer the user question. Therefore you need to write a Cypher statement to get the relevant
 information.
 
 Here is the question:
 {query}
 
-Here is the semantic result that extracted the most similiar nodes to the users question:
+Here is the semantic result that extracted the most similar nodes to the users question:
 {semantic_results}
 
 Use the graph schema to formulate the Cypher statement.
 {schema}
 
-Here are the Cypher Statements you can choose from. 
+Here are the Cypher Statements you can choose from.
 
-IMPORTANT: You must replace ANY_NAME with an actual name from the semantic results if applicable. 
+IMPORTANT: You must replace ANY_NAME with an actual name from the semantic results if applicable.
 
 ```cypher
-# FUNCTION RELATED QUERIES
+"""
+
+# Template for Cypher generation with semantic search results
+CYPHER_GENERATION_TEMPLATE = _CYPHER_PROMPT_HEADER + """# FUNCTION RELATED QUERIES
 
 01. To find all functional requirements that functions must satisfy
     MATCH (f:function)-[:MUST_SATISFY]->(fr:functional_requirement)
@@ -315,3 +318,11 @@ IMPORTANT: You must replace ANY_NAME with an actual name from the semantic resul
     RETURN a.name AS entity1_name, a.description AS entity1_desc, mo.name AS entity2_name, mo.description AS entity2_desc
 ```
 """
+
+# Template for Cypher generation with only the example queries retrieved for the question
+# (see tools/graph_search/template_catalog.py)
+CYPHER_RETRIEVAL_TEMPLATE = _CYPHER_PROMPT_HEADER + """# EXAMPLES CLOSEST TO THE QUESTION
+
+{templates}
+```
+"""
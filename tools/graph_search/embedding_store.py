@@ -0,0 +1,105 @@
+# tools/graph_search/embedding_store.py
+import glob
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+from utils.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+# Get the configuration
+config = load_config()
+embedding_store_config = config.get("embedding_store", {})
+
+
+def embedding_store_path(embedding_set: Dict[str, Any]) -> str:
+    """Base path of an embedding set's store, without the .json extension"""
+    return os.path.join(embedding_store_config.get("path", "data/embeddings"), embedding_set["property"])
+
+
+def write_embedding_store(base_path: str, rows: Iterable[Dict[str, Any]], count: int,
+                          metadata: Dict[str, Any]) -> int:
+    """
+    Write an embedding matrix as <base_path>.<timestamp>.npy plus a <base_path>.json sidecar.
+
+    Row i of the matrix is the unit-normalized embedding of node i of the sidecar
+    (elementId, name, label, description). `count` is the expected number of rows;
+    if fewer arrive, the tail of the matrix stays unused and the sidecar count is
+    authoritative. The sidecar names its matrix file and is renamed into place last,
+    so readers always see a matching pair. Returns the rows written.
+    """
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    sidecar_path = f"{base_path}.json"
+    matrix_file = f"{os.path.basename(base_path)}.{int(time.time() * 1000)}.npy"
+    matrix_path = os.path.join(os.path.dirname(base_path), matrix_file)
+
+    matrix = np.lib.format.open_memmap(
+        matrix_path, mode="w+", dtype=np.float32, shape=(count, metadata["dimension"])
+    )
+    nodes = []
+    for row in rows:
+        if len(nodes) == count:
+            break
+        vector = np.asarray(row["embedding"], dtype=np.float32)
+        matrix[len(nodes)] = vector / (np.linalg.norm(vector) or 1.0)
+        nodes.append({
+            "elementId": row["elementId"],
+            "label": row.get("label", "unknown"),
+            "name": row.get("name", ""),
+            "description": row.get("description", ""),
+        })
+    matrix.flush()
+    del matrix
+
+    with open(f"{sidecar_path}.tmp", "w", encoding="utf-8") as sidecar_file:
+        json.dump({**metadata, "matrix": matrix_file, "count": len(nodes), "nodes": nodes}, sidecar_file)
+    os.replace(f"{sidecar_path}.tmp", sidecar_path)
+
+    # Processes that still map an older matrix keep their pages until they reload
+    for old_path in glob.glob(f"{glob.escape(base_path)}.*.npy"):
+        if old_path != matrix_path:
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                logger.warning(f"Could not remove old embedding matrix {old_path}: {str(e)}")
+
+    logger.info(f"Wrote embedding store {matrix_path} with {len(nodes)} rows")
+    return len(nodes)
+
+
+def load_embedding_store(base_path: str) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+    """
+    Memory-map an embedding store read-only. Returns (matrix, sidecar) or None if
+    the store is missing or inconsistent. Pages of the matrix are shared between
+    all processes that map the same file.
+    """
+    sidecar_path = f"{base_path}.json"
+    if not os.path.exists(sidecar_path):
+        return None
+
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as sidecar_file:
+            sidecar = json.load(sidecar_file)
+        matrix = np.load(os.path.join(os.path.dirname(base_path), sidecar["matrix"]), mmap_mode="r")
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not load embedding store {base_path}: {str(e)}")
+        return None
+
+    count = sidecar.get("count", 0)
+    if matrix.ndim != 2 or matrix.shape[0] < count or matrix.shape[1] != sidecar.get("dimension"):
+        logger.warning(f"Embedding store {base_path} is inconsistent: matrix {matrix.shape}, "
+                       f"sidecar {count} x {sidecar.get('dimension')}")
+        return None
+    # Slicing keeps the memory map, nothing is read yet
+    return matrix[:count], sidecar
+
+
+def store_matches(sidecar: Dict[str, Any], embedding_set: Dict[str, Any]) -> bool:
+    """Whether a store was exported from the given embedding set"""
+    return (sidecar.get("version") == embedding_set["version"]
+            and sidecar.get("model") == embedding_set["model_id"]
+            and sidecar.get("dimension") == embedding_set["dimension"])
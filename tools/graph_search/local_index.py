@@ -0,0 +1,418 @@
+# tools/graph_search/local_index.py
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Iterable, Optional
+
+import numpy as np
+from data.knowledgegraph import get_driver
+from models.embedding import get_live_embedding_set
+from tools.graph_search.embedding_store import embedding_store_path, load_embedding_store, store_matches
+from utils.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+# Get the configuration
+config = load_config()
+neo4j_config = config.get("neo4j", {})
+vector_index_config = config.get("vector_index", {})
+local_index_config = config.get("local_index", {})
+embedding_store_config = config.get("embedding_store", {})
+
+
+class LocalVectorIndex:
+    """
+    In-process nearest-neighbour index over node description embeddings.
+
+    Small graphs are searched by brute force (one matrix-vector product). Once the
+    index grows past `ivf_threshold` vectors an inverted-file structure is built:
+    vectors are clustered with spherical k-means and a query only scores the
+    members of the `nprobe` closest clusters.
+
+    Scores are reported on the same [0, 1] scale as Neo4j's cosine vector index,
+    (1 + cos) / 2, so the `rag.similarity_threshold` keeps its meaning.
+    """
+
+    def __init__(self, dimension: int, ivf_threshold: int = 20000, nprobe: int = 8,
+                 embedding_set: Optional[Dict[str, Any]] = None):
+        self.dimension = dimension
+        # Embedding set the vectors were loaded from, see models.embedding.get_embedding_set()
+        self.embedding_set = embedding_set
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.last_refresh = 0.0
+        self.watermark = 0
+
+        self._lock = threading.RLock()
+        self._vectors = np.empty((0, dimension), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        # Label of every row as a small integer code, for label-filtered search
+        self._label_codes = np.empty(0, dtype=np.int32)
+        self._label_ids: Dict[str, int] = {}
+
+        # IVF state, only populated once the index exceeds ivf_threshold
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[set] = []
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._ivf_built_size = 0
+
+    @classmethod
+    def from_store(cls, matrix: np.ndarray, sidecar: Dict[str, Any], ivf_threshold: int = 20000,
+                   nprobe: int = 8, embedding_set: Optional[Dict[str, Any]] = None) -> "LocalVectorIndex":
+        """
+        Index over a memory-mapped embedding store (see embedding_store.py). The rows
+        are used in place and only copied into memory once the index is modified.
+        """
+        index = cls(matrix.shape[1], ivf_threshold=ivf_threshold, nprobe=nprobe, embedding_set=embedding_set)
+        with index._lock:
+            nodes = sidecar["nodes"]
+            index._vectors = matrix
+            index._size = len(nodes)
+            index._ids = [node["elementId"] for node in nodes]
+            index._metadata = nodes
+            index._positions = {element_id: position for position, element_id in enumerate(index._ids)}
+            index._label_codes = np.array([index._label_code(node["label"]) for node in nodes], dtype=np.int32)
+            index.watermark = sidecar.get("watermark", 0)
+            index._maybe_rebuild_ivf()
+        return index
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def uses_ivf(self) -> bool:
+        return self._centroids is not None
+
+    def upsert(self, rows: Iterable[Dict[str, Any]]):
+        """Insert or replace nodes. Each row needs elementId and embedding, plus label/name/description"""
+        with self._lock:
+            for row in rows:
+                vector = np.asarray(row["embedding"], dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                if vector.shape != (self.dimension,) or norm == 0:
+                    logger.warning(f"Skipping node {row.get('elementId')} with invalid embedding")
+                    continue
+                vector = vector / norm
+
+                metadata = {
+                    "elementId": row["elementId"],
+                    "label": row.get("label", "unknown"),
+                    "name": row.get("name", ""),
+                    "description": row.get("description", ""),
+                }
+
+                element_id = row["elementId"]
+                position = self._positions.get(element_id)
+                if position is None:
+                    position = self._append(element_id, vector, metadata)
+                else:
+                    self._ensure_writable()
+                    self._vectors[position] = vector
+                    self._metadata[position] = metadata
+                    self._label_codes[position] = self._label_code(metadata["label"])
+                    if self.uses_ivf:
+                        self._lists[self._assignments[position]].discard(position)
+
+                if self.uses_ivf:
+                    self._assign(position)
+
+            self._maybe_rebuild_ivf()
+
+    def remove(self, element_ids: Iterable[str]):
+        """Remove nodes by elementId, unknown ids are ignored"""
+        with self._lock:
+            for element_id in element_ids:
+                position = self._positions.pop(element_id, None)
+                if position is None:
+                    continue
+
+                # Swap the last row into the freed slot to keep the matrix dense
+                self._ensure_writable()
+                last = self._size - 1
+                if self.uses_ivf:
+                    self._lists[self._assignments[position]].discard(position)
+                if position != last:
+                    moved_id = self._ids[last]
+                    self._vectors[position] = self._vectors[last]
+                    self._ids[position] = moved_id
+                    self._metadata[position] = self._metadata[last]
+                    self._label_codes[position] = self._label_codes[last]
+                    self._positions[moved_id] = position
+                    if self.uses_ivf:
+                        cluster = self._assignments[last]
+                        self._lists[cluster].discard(last)
+                        self._lists[cluster].add(position)
+                        self._assignments[position] = cluster
+
+                self._ids.pop()
+                self._metadata.pop()
+                self._size -= 1
+
+            self._maybe_rebuild_ivf()
+
+    def search(self, query_embedding, limit: int = 5, threshold: float = 0.0,
+               labels: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Return up to `limit` nodes scoring above `threshold`, best first, optionally only of the given labels"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        with self._lock:
+            if self._size == 0:
+                return []
+
+            if self.uses_ivf:
+                cluster_scores = self._centroids @ query
+                probes = np.argsort(-cluster_scores)[:self.nprobe]
+                candidates = np.fromiter(
+                    (p for c in probes for p in self._lists[c]), dtype=np.int64
+                )
+            elif labels is not None:
+                candidates = np.arange(self._size)
+            else:
+                candidates = None
+
+            if labels is not None:
+                codes = [self._label_ids[label] for label in labels if label in self._label_ids]
+                candidates = candidates[np.isin(self._label_codes[candidates], codes)]
+
+            if candidates is not None:
+                if candidates.size == 0:
+                    return []
+                cosines = self._vectors[candidates] @ query
+            else:
+                cosines = self._vectors[:self._size] @ query
+
+            scores = (1.0 + cosines) / 2.0
+            if limit < scores.size:
+                top = np.argpartition(-scores, limit)[:limit]
+            else:
+                top = np.arange(scores.size)
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for i in top:
+                score = float(scores[i])
+                if score <= threshold:
+                    break
+                position = int(candidates[i]) if candidates is not None else int(i)
+                result = dict(self._metadata[position])
+                result["score"] = score
+                results.append(result)
+            return results
+
+    def _append(self, element_id: str, vector: np.ndarray, metadata: Dict[str, Any]) -> int:
+        if self._size == self._vectors.shape[0]:
+            # Grow geometrically so incremental inserts stay amortized O(1)
+            capacity = max(1024, self._vectors.shape[0] * 2)
+            grown = np.empty((capacity, self.dimension), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+            if self.uses_ivf:
+                assignments = np.zeros(capacity, dtype=np.int32)
+                assignments[:self._size] = self._assignments[:self._size]
+                self._assignments = assignments
+            label_codes = np.zeros(capacity, dtype=np.int32)
+            label_codes[:self._size] = self._label_codes[:self._size]
+            self._label_codes = label_codes
+
+        position = self._size
+        self._vectors[position] = vector
+        self._label_codes[position] = self._label_code(metadata["label"])
+        self._ids.append(element_id)
+        self._metadata.append(metadata)
+        self._positions[element_id] = position
+        self._size += 1
+        return position
+
+    def _ensure_writable(self):
+        # A memory-mapped store is read-only, it is copied into memory on the first modification
+        if not self._vectors.flags.writeable:
+            self._vectors = np.array(self._vectors)
+
+    def _label_code(self, label: str) -> int:
+        return self._label_ids.setdefault(label, len(self._label_ids))
+
+    def _assign(self, position: int):
+        cluster = int(np.argmax(self._centroids @ self._vectors[position]))
+        self._assignments[position] = cluster
+        self._lists[cluster].add(position)
+
+    def _maybe_rebuild_ivf(self):
+        if self._size < self.ivf_threshold:
+            self._centroids = None
+            self._lists = []
+            self._ivf_built_size = 0
+            return
+
+        # Rebuild when the index has drifted far from the size it was clustered at
+        if not self.uses_ivf or not (self._ivf_built_size / 2 <= self._size <= self._ivf_built_size * 2):
+            self._build_ivf()
+
+    def _build_ivf(self, iterations: int = 10, sample_size: int = 50000):
+        vectors = self._vectors[:self._size]
+        n_lists = max(1, int(4 * np.sqrt(self._size)))
+        rng = np.random.default_rng(0)
+
+        sample = vectors[rng.choice(self._size, size=min(sample_size, self._size), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].copy()
+
+        # Spherical k-means: vectors are unit length, so the closest centroid has the largest dot product
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        assignments = np.zeros(self._vectors.shape[0], dtype=np.int32)
+        for start in range(0, self._size, 8192):
+            chunk = vectors[start:start + 8192]
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+
+        lists = [set() for _ in range(n_lists)]
+        for position in range(self._size):
+            lists[assignments[position]].add(position)
+
+        self._centroids = centroids
+        self._assignments = assignments
+        self._lists = lists
+        self._ivf_built_size = self._size
+        logger.info(f"Built IVF structure with {n_lists} lists over {self._size} vectors")
+
+
+# --- Loading from the knowledge graph ---
+
+_local_index = None
+_local_index_lock = threading.Lock()
+
+
+def _fetch_embedded_nodes(driver, embedding_set: Dict[str, Any], since: int = 0) -> List[Dict[str, Any]]:
+    index_label = vector_index_config.get("label", "Embedded")
+    index_property = embedding_set["property"]
+    updated_property = embedding_set["updated_property"]
+
+    # Label and property keys cannot be parameterized, they come from config.json
+    cypher_query = f'''
+    MATCH (n:`{index_label}`)
+    WHERE n.`{index_property}` IS NOT NULL AND coalesce(n.`{updated_property}`, 0) > $since
+    RETURN elementId(n) AS elementId,
+           [l IN labels(n) WHERE l <> $indexLabel] AS labels,
+           n.name AS name, n.description AS description,
+           n.`{index_property}` AS embedding,
+           coalesce(n.`{updated_property}`, 0) AS updatedAt
+    '''
+    records, _, _ = driver.execute_query(
+        cypher_query,
+        since=since,
+        indexLabel=index_label,
+        database_=neo4j_config.get("database", "")
+    )
+
+    rows = []
+    for record in records:
+        node_labels = record.get("labels", [])
+        rows.append({
+            "elementId": record.get("elementId"),
+            "label": node_labels[0] if node_labels else "unknown",
+            "name": record.get("name", ""),
+            "description": record.get("description", ""),
+            "embedding": record.get("embedding"),
+            "updatedAt": record.get("updatedAt", 0),
+        })
+    return rows
+
+
+def _fetch_embedded_ids(driver, embedding_set: Dict[str, Any]) -> set:
+    index_label = vector_index_config.get("label", "Embedded")
+    index_property = embedding_set["property"]
+
+    records, _, _ = driver.execute_query(
+        f'MATCH (n:`{index_label}`) WHERE n.`{index_property}` IS NOT NULL RETURN elementId(n) AS elementId',
+        database_=neo4j_config.get("database", "")
+    )
+    return {record.get("elementId") for record in records}
+
+
+def refresh_local_index(index: LocalVectorIndex, full: bool = False):
+    """
+    Pull changes from the graph into the local index.
+
+    Only nodes whose `embedding_updated_at` (set by utils/create_embeddings.py) is newer
+    than the last refresh are transferred. Nodes that lost their embedding are removed.
+    """
+    driver = get_driver("neo4j")
+    since = 0 if full else index.watermark
+    rows = _fetch_embedded_nodes(driver, index.embedding_set, since=since)
+    live_ids = _fetch_embedded_ids(driver, index.embedding_set)
+
+    with index._lock:
+        stale_ids = [element_id for element_id in index._ids if element_id not in live_ids]
+        index.remove(stale_ids)
+        index.upsert(rows)
+        if rows:
+            index.watermark = max(index.watermark, max(row["updatedAt"] for row in rows))
+        index.last_refresh = time.time()
+
+    logger.info(f"Local vector index refreshed: {len(rows)} upserted, {len(stale_ids)} removed, {len(index)} total")
+
+
+def _load_local_index(embedding_set: Dict[str, Any]) -> LocalVectorIndex:
+    """Start from the memory-mapped store written by utils/create_embeddings.py if there is one"""
+    ivf_threshold = local_index_config.get("ivf_threshold", 20000)
+    nprobe = local_index_config.get("nprobe", 8)
+
+    store = load_embedding_store(embedding_store_path(embedding_set)) if embedding_store_config.get("enabled", True) else None
+    if store is not None and store_matches(store[1], embedding_set):
+        index = LocalVectorIndex.from_store(*store, ivf_threshold=ivf_threshold, nprobe=nprobe,
+                                            embedding_set=embedding_set)
+        logger.info(f"Local vector index mapped {len(index)} vectors from the embedding store")
+        try:
+            # Only nodes re-embedded since the export are transferred
+            refresh_local_index(index)
+        except Exception as e:
+            logger.warning(f"Local vector index refresh failed, serving the embedding store as exported: {str(e)}")
+            index.last_refresh = time.time()
+        return index
+
+    index = LocalVectorIndex(
+        dimension=embedding_set["dimension"],
+        ivf_threshold=ivf_threshold,
+        nprobe=nprobe,
+        embedding_set=embedding_set,
+    )
+    refresh_local_index(index, full=True)
+    return index
+
+
+def get_local_index(embedding_set: Optional[Dict[str, Any]] = None) -> LocalVectorIndex:
+    """
+    Returns the process-wide local index, loading it from the graph on first use.
+
+    The index holds one embedding set (the live one by default). When another set is
+    requested, e.g. after a switchover, it is rebuilt from that set's properties.
+    """
+    global _local_index
+    if embedding_set is None:
+        embedding_set = get_live_embedding_set()
+
+    with _local_index_lock:
+        if _local_index is None or _local_index.embedding_set["version"] != embedding_set["version"]:
+            _local_index = _load_local_index(embedding_set)
+
+    # Periodically pick up nodes re-embedded since the last refresh
+    refresh_interval = local_index_config.get("refresh_interval", 60)
+    if refresh_interval and time.time() - _local_index.last_refresh > refresh_interval:
+        try:
+            refresh_local_index(_local_index)
+        except Exception as e:
+            logger.warning(f"Local vector index refresh failed, serving stale index: {str(e)}")
+            _local_index.last_refresh = time.time()
+
+    return _local_index
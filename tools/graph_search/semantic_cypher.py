@@ -1,82 +1,303 @@
 # tools/graph_search/semantic_cypher.py
 import logging
-from typing import Dict, Any, List
+import re
+import threading
+from typing import Dict, Any, List, Optional
 from langchain_neo4j import GraphCypherQAChain
 from langchain.prompts.prompt import PromptTemplate
 from models.llm import get_llm
-from models.embedding import get_embedding_model
+from models.embedding import get_embedding_model, get_live_embedding_set
 from utils.utils import load_config
 import neo4j
-from data.knowledgegraph import get_agent_graph
-from tools.graph_search.cypher_generation_template import CYPHER_GENERATION_TEMPLATE
-import os
+from data.knowledgegraph import get_agent_graph, get_driver, get_graph_schema, current_graph_version
+from tools.graph_search.cypher_generation_template import CYPHER_GENERATION_TEMPLATE, CYPHER_RETRIEVAL_TEMPLATE
+from tools.graph_search.template_catalog import get_template_catalog, format_templates
+from tools.graph_search.template_fast_path import run_template_fast_path
+from tools.graph_search.cypher_cache import cypher_cache, cypher_cache_key
+from tools.graph_search.local_index import get_local_index
 
 logger = logging.getLogger(__name__)
 
 # Get the configuration
-NEO4J_ADMIN = os.getenv('NEO4J_ADMIN')
 config = load_config()
 neo4j_config = config.get("neo4j", {})
 neo4j_agent_config = config.get("neo4j_agent", {})
 rag_config = config.get("rag", {})
+vector_index_config = config.get("vector_index", {})
+fulltext_index_config = config.get("fulltext_index", {})
 
+# Shared Cypher QA chain, see get_cypher_chain()
+_cypher_chain = None
+_cypher_chain_schema = None
+_cypher_chain_lock = threading.Lock()
 
-def semantic_search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
-    """Perform semantic search on the knowledge graph using the user query"""
-    # Get configuration
-    uri = neo4j_config.get("uri", "")
-    auth = (neo4j_config.get("username", ""), NEO4J_ADMIN)
-    db_name = neo4j_config.get("database", "")
+
+def semantic_search(query: str, limit: int = 5, labels: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Perform semantic search on the knowledge graph using the configured backend.
+
+    If the query names nodes exactly, those nodes are returned right away with score
+    1.0 and no embedding is computed. Otherwise vector hits are fused with full-text
+    hits on name/description by reciprocal rank fusion; the reported score stays the
+    vector similarity of each node, so thresholds downstream keep their meaning.
+
+    `labels` restricts the search to nodes of those types (e.g. ["solution"]); the
+    vector search then only queries the per-label indexes of vector_index.partition_labels.
+    """
+    return semantic_search_many([query], limit=limit, labels=labels)[0]
+
+
+def semantic_search_many(queries: List[str], limit: int = 5,
+                         labels: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Semantic search for several queries at once, returning one result list per query.
+
+    All queries are embedded in a single batched encode() call and each retrieval
+    stage (exact names, vector index, full-text index) is a single UNWIND query.
+    """
+    logger.info(f"Performing semantic search for: {queries}")
+    results = [[] for _ in queries]
+
+    if labels is not None:
+        partition_labels = vector_index_config.get("partition_labels", [])
+        unknown = [label for label in labels if label not in partition_labels]
+        if unknown:
+            logger.warning(f"Ignoring labels without a vector index: {', '.join(unknown)}")
+        labels = [label for label in labels if label in partition_labels]
+        if not labels:
+            return results
+
+    # Exact engineering identifiers need no embedding at all
+    pending = list(range(len(queries)))
+    if rag_config.get("exact_name_shortcut", True):
+        exact_results = _exact_name_search_many(queries, limit, labels)
+        for i, exact in enumerate(exact_results):
+            if exact:
+                logger.info(f"Found {len(exact)} exact name matches for '{queries[i]}'")
+                results[i] = exact
+        pending = [i for i in pending if not results[i]]
+
+    if not pending:
+        return results
 
     # Get similarity threshold from config
     similarity_threshold = rag_config.get("similarity_threshold", 0.7)
 
-    # Get embedding model
-    embedding_model = get_embedding_model()
+    # Embedding set currently live (embedding.version in config.json) and its query model
+    embedding_set = get_live_embedding_set()
+    embedding_model = get_embedding_model(embedding_set)
+
+    pending_queries = [queries[i] for i in pending]
+    query_embeddings = embedding_model.encode(pending_queries)
+
+    vector_results = None
+    backend = rag_config.get("backend", "neo4j")
+    if backend == "local":
+        try:
+            local_index = get_local_index(embedding_set)
+            vector_results = [
+                local_index.search(embedding, limit=limit, threshold=similarity_threshold, labels=labels)
+                for embedding in query_embeddings
+            ]
+        except Exception as e:
+            # Fall back to the database index if the local index cannot be loaded
+            logger.error(f"Error during local semantic search, falling back to Neo4j: {str(e)}")
+
+    if vector_results is None:
+        vector_results = _neo4j_vector_search_many(
+            query_embeddings.tolist(), limit, similarity_threshold, embedding_set, labels
+        )
+
+    if rag_config.get("hybrid", True):
+        text_results = _fulltext_search_many(
+            pending_queries, query_embeddings.tolist(), limit, similarity_threshold, embedding_set, labels
+        )
+        vector_results = [
+            reciprocal_rank_fusion([vector_hits, text_hits], limit, k=rag_config.get("rrf_k", 60))
+            for vector_hits, text_hits in zip(vector_results, text_results)
+        ]
+
+    for i, query_results in zip(pending, vector_results):
+        results[i] = query_results
+        logger.info(f"Found {len(query_results)} results for semantic search '{queries[i]}'")
+
+    return results
 
-    results = []
 
-    logger.info(f"Performing semantic search for: '{query}'")
-    driver = neo4j.GraphDatabase.driver(uri, auth=auth)
+# Identifier-like tokens: mixed case with at least two capitals (BatteryPack, DCDCConverter),
+# or containing an underscore. All-caps acronyms such as HVAC or ECU are ordinary words.
+_IDENTIFIER_PATTERN = re.compile(r"\b(?:(?=\w*[a-z])(?=(?:\w*[A-Z]){2})[A-Za-z][A-Za-z0-9]*|\w+_\w+)\b")
+# Characters with a meaning in Lucene query syntax
+_LUCENE_SPECIAL_PATTERN = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def _grouped_node_results(records, count: int) -> List[List[Dict[str, Any]]]:
+    """Split rows of an UNWIND query into per-query result lists using the `i` column"""
+    grouped = [[] for _ in range(count)]
+    for record in records:
+        node_labels = record.get("labels", [])
+        label = node_labels[0] if node_labels else "unknown"
+
+        grouped[record.get("i")].append({
+            "elementId": record.get("elementId"),
+            "label": label,
+            "name": record.get("name", ""),
+            "description": record.get("description", ""),
+            "score": record.get("score", 0)
+        })
+    return grouped
+
+
+def _exact_name_search_many(queries: List[str], limit: int,
+                            labels: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+    """Nodes whose name equals the whole query or an identifier-like token in it"""
+    rows = []
+    for i, query in enumerate(queries):
+        candidates = {query.strip().strip("'\"`?.!")}
+        candidates.update(_IDENTIFIER_PATTERN.findall(query))
+        candidates.discard("")
+        rows.append({"i": i, "names": list(candidates)})
+
+    index_label = vector_index_config.get("label", "Embedded")
+
+    # Label cannot be parameterized, it comes from config.json
+    cypher_query = f'''
+    UNWIND $rows AS row
+    CALL {{
+        WITH row
+        MATCH (n:`{index_label}`)
+        WHERE n.name IN row.names AND ($labels IS NULL OR any(l IN labels(n) WHERE l IN $labels))
+        RETURN n
+        LIMIT $limit
+    }}
+    RETURN row.i AS i, elementId(n) AS elementId, [l IN labels(n) WHERE l <> $indexLabel] AS labels,
+           n.name AS name, n.description AS description, 1.0 AS score
+    '''
+
+    try:
+        records, _, _ = get_driver("neo4j").execute_query(
+            cypher_query,
+            rows=rows,
+            indexLabel=index_label,
+            labels=labels,
+            limit=limit,
+            database_=neo4j_config.get("database", "")
+        )
+        return _grouped_node_results(records, len(queries))
+    except Exception as e:
+        logger.error(f"Error during exact name search: {str(e)}")
+        return [[] for _ in queries]
+
+
+def _neo4j_vector_search_many(query_embeddings: List[List[float]], limit: int, similarity_threshold: float,
+                              embedding_set: Dict[str, Any],
+                              labels: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+    """Rank nodes through the Neo4j vector index of an embedding set, one UNWIND row per query"""
+    db_name = neo4j_config.get("database", "")
 
-    query_embedding = embedding_model.encode(query).tolist()
+    # Vector index built by utils/create_vectorindex.py
+    index_name = embedding_set["index_name"]
+    index_label = vector_index_config.get("label", "Embedded")
 
+    # With a label filter only the per-label indexes created by utils/create_vectorindex.py are queried
+    index_names = [f"{index_name}_{label}" for label in labels] if labels else [index_name]
+
+    driver = get_driver("neo4j")
+
+    # The index returns the approximate top `limit` neighbours, the threshold is
+    # applied afterwards. The shared index label is dropped so that the domain
+    # label (function, solution, ...) is reported.
     cypher_query = '''
-    MATCH (n)
-    WITH n, vector.similarity.cosine(n.description_embedding, $queryEmbedding) AS score
+    UNWIND range(0, size($queryEmbeddings) - 1) AS i
+    UNWIND $indexNames AS indexName
+    CALL db.index.vector.queryNodes(indexName, $limit, $queryEmbeddings[i])
+    YIELD node AS n, score
     WHERE score > $threshold
-    RETURN labels(n) AS labels, n.name AS name, n.description AS description, score
-    ORDER BY score DESC
-    LIMIT $limit
+    RETURN i, elementId(n) AS elementId, [l IN labels(n) WHERE l <> $indexLabel] AS labels,
+           n.name AS name, n.description AS description, score
+    ORDER BY i, score DESC
     '''
 
     try:
         related_nodes, _, _ = driver.execute_query(
             cypher_query,
-            queryEmbedding=query_embedding,
+            indexNames=index_names,
+            indexLabel=index_label,
+            queryEmbeddings=query_embeddings,
             threshold=similarity_threshold,
             limit=limit,
             database_=db_name
         )
+        # Several label indexes return up to `limit` hits each
+        return [hits[:limit] for hits in _grouped_node_results(related_nodes, len(query_embeddings))]
+    except Exception as e:
+        logger.error(f"Error during semantic search: {str(e)}")
+        return [[] for _ in query_embeddings]  # Return empty results on error
+
 
-        for record in related_nodes:
-            node_labels = record.get("labels", [])
-            label = node_labels[0] if node_labels else "unknown"
+def _fulltext_search_many(queries: List[str], query_embeddings: List[List[float]], limit: int,
+                          similarity_threshold: float, embedding_set: Dict[str, Any],
+                          labels: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Rank nodes through the full-text index on name/description, reporting their vector similarity.
+    Hits at or below the similarity threshold are dropped, like those of the vector search.
+    """
+    rows = []
+    for i, (query, embedding) in enumerate(zip(queries, query_embeddings)):
+        # Escape query syntax; lower-cased AND/OR/NOT are plain terms for the analyzer
+        terms = [_LUCENE_SPECIAL_PATTERN.sub(r"\\\1", term) for term in query.split()]
+        terms = [term.lower() if term in ("AND", "OR", "NOT") else term for term in terms]
+        if terms:
+            rows.append({"i": i, "text": " ".join(terms), "embedding": embedding})
 
-            results.append({
-                "label": label,
-                "name": record.get("name", ""),
-                "description": record.get("description", ""),
-                "score": record.get("score", 0)
-            })
+    if not rows:
+        return [[] for _ in queries]
+
+    index_label = vector_index_config.get("label", "Embedded")
+    index_property = embedding_set["property"]
+
+    # Property key cannot be parameterized, it comes from config.json
+    cypher_query = f'''
+    UNWIND $rows AS row
+    CALL db.index.fulltext.queryNodes($indexName, row.text, {{limit: $limit}})
+    YIELD node AS n, score AS textScore
+    WHERE $labels IS NULL OR any(l IN labels(n) WHERE l IN $labels)
+    WITH row, n, textScore, coalesce(vector.similarity.cosine(n.`{index_property}`, row.embedding), 0.0) AS score
+    WHERE score > $threshold
+    RETURN row.i AS i, elementId(n) AS elementId, [l IN labels(n) WHERE l <> $indexLabel] AS labels,
+           n.name AS name, n.description AS description, score
+    ORDER BY i, textScore DESC
+    '''
 
-        logger.info(f"Found {len(results)} results for semantic search")
+    try:
+        records, _, _ = get_driver("neo4j").execute_query(
+            cypher_query,
+            indexName=fulltext_index_config.get("name", "nodeText"),
+            indexLabel=index_label,
+            labels=labels,
+            rows=rows,
+            limit=limit,
+            threshold=similarity_threshold,
+            database_=neo4j_config.get("database", "")
+        )
+        return _grouped_node_results(records, len(queries))
     except Exception as e:
-        logger.error(f"Error during semantic search: {str(e)}")
-        results = []  # Return empty results on error
-    finally:
-        driver.close()
+        logger.error(f"Error during full-text search: {str(e)}")
+        return [[] for _ in queries]
+
 
+def reciprocal_rank_fusion(rankings: List[List[Dict[str, Any]]], limit: int, k: int = 60) -> List[Dict[str, Any]]:
+    """Fuse ranked result lists: each node scores sum(1 / (k + rank)) over the lists it appears in"""
+    fused = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, 1):
+            key = result.get("elementId") or (result.get("label"), result.get("name"))
+            entry = fused.setdefault(key, {**result, "rrf_score": 0.0})
+            entry["rrf_score"] += 1.0 / (k + rank)
+            entry["score"] = max(entry.get("score", 0), result.get("score", 0))
+
+    results = sorted(fused.values(), key=lambda result: result["rrf_score"], reverse=True)[:limit]
+    logger.info(f"Fused {sum(len(ranking) for ranking in rankings)} hits into {len(results)} results")
     return results
 
 
@@ -95,38 +316,118 @@ def format_semantic_results(results: List[Dict[str, Any]]) -> str:
     return formatted
 
 
+def get_cypher_chain() -> GraphCypherQAChain:
+    """
+    Returns the shared GraphCypherQAChain.
+
+    The prompt, LLM client and chain are built once and reused by every query; only
+    `query` and `semantic_results` vary per invocation. The chain is rebuilt when the
+    cached graph schema changes, since from_llm() bakes the schema into the chain.
+    """
+    global _cypher_chain, _cypher_chain_schema
+
+    # Cached schema, only re-introspected after the graph version changes
+    schema = get_graph_schema()
+
+    with _cypher_chain_lock:
+        if _cypher_chain is None or schema != _cypher_chain_schema:
+            # With template retrieval the prompt carries only the top-k example queries
+            if rag_config.get("template_retrieval", True):
+                cypher_prompt = PromptTemplate.from_template(CYPHER_RETRIEVAL_TEMPLATE)
+            else:
+                cypher_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
+
+            # Fixed: Pass agent name to get_llm
+            llm = get_llm("searchagent")  # or whatever agent name is appropriate for search
+            graph = get_agent_graph()
+
+            logger.info("Initializing GraphCypherQAChain")
+            _cypher_chain = GraphCypherQAChain.from_llm(
+                llm,
+                graph=graph,
+                verbose=rag_config.get("verbose", True),
+                cypher_prompt=cypher_prompt,
+                allow_dangerous_requests=True,
+                top_k=100,
+                # Exposes the generated Cypher so it can be cached
+                return_intermediate_steps=True,
+            )
+            _cypher_chain_schema = schema
+
+        return _cypher_chain
+
+
+def _answer_from_cypher(cypher_search: GraphCypherQAChain, query: str, cypher: str) -> str:
+    """Run previously generated Cypher and answer through the chain's QA step, skipping Cypher generation"""
+    context = cypher_search.graph.query(cypher)[:cypher_search.top_k]
+    result = cypher_search.qa_chain.invoke({"question": query, "context": context})
+    return result if isinstance(result, str) else result.get("text", "No results found")
+
+
+def split_sub_questions(query: str) -> List[str]:
+    """Sub-questions of an agent input, one per line or separated by ';'"""
+    return [part.strip() for part in re.split(r"[;\n]", query) if part.strip()]
+
+
 def semantic_cypher_search(query: str) -> str:
     logger.info(f"Processing query: {query}")
 
-    # Perform semantic search directly with the user query
-    semantic_results = semantic_search(
-        query,
+    sub_questions = split_sub_questions(query) or [query]
+
+    # Perform semantic search directly with the user query, one batch for all sub-questions
+    all_semantic_results = semantic_search_many(
+        sub_questions,
         limit=rag_config.get("top_k", 5)
     )
 
-    formatted_semantic_results = format_semantic_results(semantic_results)
+    if len(sub_questions) == 1:
+        return _answer_question(sub_questions[0], all_semantic_results[0])
 
-    cypher_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
+    answers = []
+    for sub_question, semantic_results in zip(sub_questions, all_semantic_results):
+        answers.append(f"Question: {sub_question}\nAnswer: {_answer_question(sub_question, semantic_results)}")
+    return "\n\n".join(answers)
 
-    # Fixed: Pass agent name to get_llm
-    llm = get_llm("searchagent")  # or whatever agent name is appropriate for search
-    graph = get_agent_graph()
 
-    logger.info("Initializing GraphCypherQAChain")
-    cypher_search = GraphCypherQAChain.from_llm(
-        llm,
-        graph=graph,
-        verbose=rag_config.get("verbose", True),
-        cypher_prompt=cypher_prompt,
-        allow_dangerous_requests=True,
-        top_k=100,
-    )
+def _answer_question(query: str, semantic_results: List[Dict[str, Any]]) -> str:
+    """Answer one question from its semantic hits via the template fast path, cached Cypher or the chain"""
+    # Questions that map confidently onto one template are answered without the LLM
+    if rag_config.get("fast_path", True):
+        fast_path_result = run_template_fast_path(query, semantic_results)
+        if fast_path_result is not None:
+            return fast_path_result
+
+    cypher_search = get_cypher_chain()
+
+    # Cypher generated earlier for the same question and semantic hits is executed directly
+    cache_key = cypher_cache_key(query, semantic_results)
+    graph_version = current_graph_version()
+    cached_cypher = cypher_cache.get(cache_key, graph_version)
+    if cached_cypher is not None:
+        try:
+            logger.info(f"Using cached Cypher: {cached_cypher}")
+            return _answer_from_cypher(cypher_search, query, cached_cypher)
+        except Exception as e:
+            logger.warning(f"Cached Cypher failed, regenerating: {str(e)}")
+            cypher_cache.invalidate(cache_key)
+
+    # Prompt inputs are only built on a cache miss, template retrieval encodes the question
+    chain_inputs = {
+        "query": query,
+        "semantic_results": format_semantic_results(semantic_results)
+    }
+    if rag_config.get("template_retrieval", True):
+        templates = get_template_catalog().retrieve(query, k=rag_config.get("template_top_k", 8))
+        logger.info(f"Retrieved Cypher templates: {', '.join(t['number'] for t in templates)}")
+        chain_inputs["templates"] = format_templates(templates)
 
     try:
-        chain_response = cypher_search.invoke({
-            "query": query,
-            "semantic_results": formatted_semantic_results
-        })
+        chain_response = cypher_search.invoke(chain_inputs)
+
+        intermediate_steps = chain_response.get("intermediate_steps", [])
+        generated_cypher = intermediate_steps[0].get("query") if intermediate_steps else None
+        if generated_cypher:
+            cypher_cache.put(cache_key, graph_version, generated_cypher)
 
         # Extract the result from the invoke() response
         result_text = chain_response.get("result", "No results found")
@@ -0,0 +1,84 @@
+# tools/graph_search/template_catalog.py
+import logging
+import re
+import threading
+from typing import Dict, Any, List
+
+import numpy as np
+from models.embedding import get_embedding_model
+from tools.graph_search.cypher_generation_template import CYPHER_GENERATION_TEMPLATE
+
+logger = logging.getLogger(__name__)
+
+# "02. To find all ..." followed by the indented Cypher lines of that example
+_TEMPLATE_PATTERN = re.compile(r"^(\d+)\.\s+(.+)\n((?:[ \t]+\S.*\n?)+)", re.MULTILINE)
+_SECTION_PATTERN = re.compile(r"^# (.+?) RELATED QUERIES", re.MULTILINE)
+
+
+def parse_cypher_templates(template_text: str = CYPHER_GENERATION_TEMPLATE) -> List[Dict[str, Any]]:
+    """Parse the numbered example queries of a Cypher generation prompt into a catalog"""
+    sections = [(match.start(), match.group(1).title()) for match in _SECTION_PATTERN.finditer(template_text)]
+
+    templates = []
+    for match in _TEMPLATE_PATTERN.finditer(template_text):
+        section = next((name for start, name in reversed(sections) if start < match.start()), "")
+        # The prompt source escapes braces for PromptTemplate; the catalog keeps plain Cypher
+        cypher = "\n".join(line.strip() for line in match.group(3).strip().splitlines())
+        cypher = cypher.replace("{{", "{").replace("}}", "}")
+        templates.append({
+            "number": match.group(1),
+            "section": section,
+            "description": match.group(2).strip(),
+            "cypher": cypher,
+            "specific": "ANY_NAME" in cypher,
+        })
+
+    logger.info(f"Parsed {len(templates)} Cypher templates")
+    return templates
+
+
+def format_templates(templates: List[Dict[str, Any]]) -> str:
+    """Render catalog entries in the numbered layout the Cypher prompt uses"""
+    blocks = []
+    for template in templates:
+        cypher = "\n".join(f"    {line}" for line in template["cypher"].splitlines())
+        blocks.append(f"{template['number']}. {template['description']}\n{cypher}")
+    return "\n\n".join(blocks)
+
+
+class TemplateCatalog:
+    """Cypher templates with embedded descriptions, ranked against a query by cosine similarity"""
+
+    def __init__(self, templates: List[Dict[str, Any]], embedding_model):
+        self.templates = templates
+        self.embedding_model = embedding_model
+        texts = [f"{template['section']}: {template['description']}" for template in templates]
+        self.embeddings = np.asarray(
+            embedding_model.encode(texts, normalize_embeddings=True), dtype=np.float32
+        )
+
+    def rank(self, query: str) -> List[tuple]:
+        """All templates as (score, template) pairs, best match first"""
+        query_embedding = np.asarray(
+            self.embedding_model.encode(query, normalize_embeddings=True), dtype=np.float32
+        )
+        scores = self.embeddings @ query_embedding
+        return [(float(scores[i]), self.templates[i]) for i in np.argsort(-scores)]
+
+    def retrieve(self, query: str, k: int = 8) -> List[Dict[str, Any]]:
+        """Top-k templates for a query, in catalog order so numbering stays readable"""
+        top = [template for _, template in self.rank(query)[:k]]
+        return sorted(top, key=lambda template: int(template["number"]))
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_template_catalog() -> TemplateCatalog:
+    """Returns the process-wide template catalog, embedding the templates on first use"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = TemplateCatalog(parse_cypher_templates(), get_embedding_model())
+        return _catalog
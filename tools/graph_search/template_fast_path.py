@@ -0,0 +1,135 @@
+# tools/graph_search/template_fast_path.py
+import logging
+import re
+from typing import Dict, Any, List, Optional
+
+from data.knowledgegraph import get_agent_graph
+from tools.graph_search.template_catalog import get_template_catalog
+from utils.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+# Get the configuration
+config = load_config()
+rag_config = config.get("rag", {})
+
+# Node pattern carrying the placeholder, e.g. (f:function {name: "ANY_NAME"})
+_ANCHOR_PATTERN = re.compile(r'\(\w+:(\w+)\s*\{name:\s*"ANY_NAME"\}\)')
+# Terms naming an entity: quoted, mixed-case CamelCase (BatteryPack, DCDCConverter)
+# or with an underscore. All-caps acronyms such as HVAC or ECU are ordinary words.
+_ENTITY_PATTERN = re.compile(
+    r"""(?<!\w)'[^']{2,}'(?!\w)|"[^"]{2,}"|\b(?:(?=\w*[a-z])(?=(?:\w*[A-Z]){2})[A-Za-z][A-Za-z0-9]*|\w+_\w+)\b"""
+)
+
+
+def _template_family(template: Dict[str, Any]) -> str:
+    """Generic and specific variants of an example share the same pattern without the name filter"""
+    return re.sub(r'\s*\{name:\s*"ANY_NAME"\}', '', template["cypher"])
+
+
+def _anchor_label(template: Dict[str, Any]) -> Optional[str]:
+    match = _ANCHOR_PATTERN.search(template["cypher"])
+    return match.group(1) if match else None
+
+
+def resolve_template(query: str, semantic_results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Map a question onto one catalog template without calling the LLM.
+
+    Templates are ranked by embedding similarity and grouped into families (generic
+    example plus its "specific" variant). The best family must score above
+    rag.fast_path_min_score and beat the runner-up family by rag.fast_path_min_margin.
+    The specific variant is chosen when a semantic hit carries the anchor label of
+    that variant, and its name is bound as the $name parameter. Returns None when
+    the match is not confident enough or the question names an entity that no
+    template parameter binds, since the generic variant would ignore it.
+    """
+    ranked = get_template_catalog().rank(query)
+
+    families = {}
+    for score, template in ranked:
+        families.setdefault(_template_family(template), []).append((score, template))
+    family_scores = sorted(((members[0][0], family) for family, members in families.items()), reverse=True)
+
+    best_score, best_family = family_scores[0]
+    runner_up = family_scores[1][0] if len(family_scores) > 1 else -1.0
+    if best_score < rag_config.get("fast_path_min_score", 0.6):
+        logger.info(f"Template fast path skipped: best template score {best_score:.3f} too low")
+        return None
+    if best_score - runner_up < rag_config.get("fast_path_min_margin", 0.05):
+        logger.info(f"Template fast path skipped: ambiguous match ({best_score:.3f} vs {runner_up:.3f})")
+        return None
+
+    members = [template for _, template in families[best_family]]
+    generic = next((template for template in members if not template["specific"]), None)
+    specific = next((template for template in members if template["specific"]), None)
+
+    # Bind the best semantic hit of the anchor label, if it is close enough to the question
+    if specific is not None:
+        label = _anchor_label(specific)
+        min_entity_score = rag_config.get("fast_path_min_entity_score", 0.75)
+        entity = next(
+            (result for result in semantic_results
+             if result.get("label") == label and result.get("score", 0) >= min_entity_score),
+            None
+        )
+        if entity is not None:
+            return {
+                "template": specific,
+                "cypher": specific["cypher"].replace('"ANY_NAME"', '$name'),
+                "params": {"name": entity.get("name")},
+                "confidence": best_score,
+            }
+
+    # A generic template would answer for all entities of a question that names one
+    unbound = _ENTITY_PATTERN.findall(query)
+    if unbound:
+        logger.info(f"Template fast path skipped: {', '.join(unbound)} not bound to a template parameter")
+        return None
+
+    # Without an entity, only run the generic variant if the question reads as a generic one
+    if generic is not None and families[best_family][0][1] is generic:
+        return {
+            "template": generic,
+            "cypher": generic["cypher"],
+            "params": {},
+            "confidence": best_score,
+        }
+
+    logger.info("Template fast path skipped: no semantic hit to bind the template to")
+    return None
+
+
+def format_fast_path_results(resolved: Dict[str, Any], records: List[Dict[str, Any]]) -> str:
+    """Format template query rows as the observation returned to the search agent"""
+    template = resolved["template"]
+    header = f"Results of query template {template['number']} ({template['description']})"
+    if resolved["params"].get("name"):
+        header += f" for '{resolved['params']['name']}'"
+
+    lines = [header + ":"]
+    for i, record in enumerate(records, 1):
+        fields = ", ".join(f"{key}: {value}" for key, value in record.items())
+        lines.append(f"{i}. {fields}")
+    return "\n".join(lines)
+
+
+def run_template_fast_path(query: str, semantic_results: List[Dict[str, Any]]) -> Optional[str]:
+    """Answer a question from a resolved template. Returns None to fall back to the LLM chain."""
+    resolved = resolve_template(query, semantic_results)
+    if resolved is None:
+        return None
+
+    try:
+        records = get_agent_graph().query(resolved["cypher"], resolved["params"])
+    except Exception as e:
+        logger.error(f"Template fast path query failed: {str(e)}")
+        return None
+
+    if not records:
+        logger.info(f"Template {resolved['template']['number']} returned no rows, falling back to LLM chain")
+        return None
+
+    logger.info(f"Answered via template {resolved['template']['number']} "
+                f"(confidence {resolved['confidence']:.3f}, {len(records)} rows)")
+    return format_fast_path_results(resolved, records[:100])
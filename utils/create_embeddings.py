@@ -1,12 +1,24 @@
 from dotenv import load_dotenv
 
 load_dotenv()
-from sentence_transformers import SentenceTransformer
 import neo4j
 from neo4j import Query
 from utils.utils import load_config
+from data.knowledgegraph import bump_graph_version
+from models.embedding import get_embedding_set, load_embedding_model
+from tools.graph_search.embedding_store import (
+    embedding_store_path, load_embedding_store, store_matches, write_embedding_store
+)
 
 import os
+import argparse
+import hashlib
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 password = os.getenv("NEO4J_ADMIN")
 
 # Load configuration
@@ -18,57 +30,299 @@ db_name = neo4j_config.get("database", "")
 
 # Get embedding configuration
 embedding_config = config.get("embedding", {})
-model_name = embedding_config.get("model", "all-MiniLM-L6-v2")
 batch_size = embedding_config.get("batch_size", 32)
-dimension = embedding_config.get("dimension", 384)
+# Nodes fetched per read query, encoded in chunks of batch_size
+page_size = embedding_config.get("page_size", 1000)
+
+# Memory-mapped copy of the embeddings for in-process search (see tools/graph_search/embedding_store.py)
+embedding_store_config = config.get("embedding_store", {})
+
+# Shared label the vector index is defined on (see utils/create_vectorindex.py)
+vector_index_config = config.get("vector_index", {})
+index_label = vector_index_config.get("label", "Embedded")
+
+
+# Pipeline stages hand over work through bounded queues, so reading, encoding and
+# writing overlap without buffering the whole graph in memory
+QUEUE_SIZE = 4
+_DONE = object()
+
+
+def embedding_text(node):
+    return f"Name: {node['name'] or ''}\nDescription: {node['description']}"
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def stream_pages(driver, query, page_size, **parameters):
+    """
+    Yield the records of one read query in lists of page_size.
+
+    The query runs once and its result is streamed from the server page_size
+    records at a time. Paging with ORDER BY ... LIMIT instead would re-scan and
+    re-sort every matching node for each page.
+    """
+    with driver.session(database=db_name, fetch_size=page_size) as session:
+        page = []
+        for record in session.run(query, parameters):
+            page.append(record.data())
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+
+def read_pages(driver, page_size, embedding_set):
+    """Yield pages of nodes with a description"""
+    # Property keys cannot be parameterized, they come from the embedding set
+    query = Query(f'''
+    MATCH (n) WHERE n.description IS NOT NULL
+    RETURN elementId(n) AS elementId, n.description AS description, n.name AS name,
+           n.`{embedding_set['hash_property']}` AS embeddingHash,
+           n.`{embedding_set['model_property']}` AS embeddingModel
+    ''')
+    return stream_pages(driver, query, page_size)
+
+
+def changed_nodes(page, embedding_set, full=False):
+    """Nodes whose embedded text or embedding model (with provider and ONNX file) differ from what is stored, with the new hash"""
+    changed = []
+    for node in page:
+        node['hash'] = text_hash(embedding_text(node))
+        if full or node['embeddingHash'] != node['hash'] or node['embeddingModel'] != embedding_set['model_id']:
+            changed.append(node)
+    return changed
+
+
+def load_set_model(embedding_set):
+    return load_embedding_model(embedding_set['provider'], embedding_set['model'], embedding_set['onnx_file'])
+
+
+def encode_batch(model, nodes, embedding_set):
+    """Embed a batch of nodes in one encode() call"""
+    texts = [embedding_text(node) for node in nodes]
+    embeddings = model.encode(texts, batch_size=batch_size)
+    return [{**node, 'model': embedding_set['model_id'], 'embedding': embedding.tolist()}
+            for node, embedding in zip(nodes, embeddings)]
+
+
+# Model and embedding set of a --workers process, loaded once per process by _init_worker
+_worker_model = None
+_worker_embedding_set = None
+
+
+def _init_worker(threads, embedding_set):
+    global _worker_model, _worker_embedding_set
+    import torch
+
+    # Without a thread cap every worker would use all cores and they would contend for them
+    torch.set_num_threads(threads)
+    _worker_model = load_set_model(embedding_set)
+    _worker_embedding_set = embedding_set
+
+
+def _encode_in_worker(nodes):
+    return encode_batch(_worker_model, nodes, _worker_embedding_set)
+
+
+def _reader(driver, pages, errors, stats, embedding_set, full):
+    try:
+        for page in read_pages(driver, page_size, embedding_set):
+            stats['scanned'] += len(page)
+            # Unchanged nodes never reach the encoder
+            page = changed_nodes(page, embedding_set, full)
+            if page:
+                pages.put(page)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        pages.put(_DONE)
+
+
+def remove_stale_embeddings(driver, embedding_set):
+    """Drop embeddings of nodes whose description was removed, returns the number of cleaned nodes"""
+    cleanup_query = Query(f'''
+    MATCH (n:`{index_label}`) WHERE n.description IS NULL
+    REMOVE n.`{embedding_set['property']}`, n.`{embedding_set['hash_property']}`,
+           n.`{embedding_set['model_property']}`, n.`{embedding_set['updated_property']}`, n:`{index_label}`
+    RETURN count(n) AS removed
+    ''')
+    records, _, _ = driver.execute_query(cleanup_query, database_=db_name)
+    return records[0].get('removed')
+
+
+def export_embedding_store(driver, embedding_set):
+    """Write the set's embeddings to the memory-mapped store that in-process search loads at startup"""
+    index_property = embedding_set['property']
+
+    # Nodes re-embedded from now on are newer than the store, incremental refreshes pick them up
+    records, _, _ = driver.execute_query(
+        Query(f'''
+        MATCH (n:`{index_label}`) WHERE n.`{index_property}` IS NOT NULL
+        RETURN count(n) AS count, max(size(n.`{index_property}`)) AS dimension, timestamp() AS exportedAt
+        '''),
+        database_=db_name
+    )
+    count, dimension, exported_at = (records[0].get(key) for key in ('count', 'dimension', 'exportedAt'))
+
+    query = Query(f'''
+    MATCH (n:`{index_label}`) WHERE n.`{index_property}` IS NOT NULL
+    RETURN elementId(n) AS elementId, [l IN labels(n) WHERE l <> $indexLabel] AS labels,
+           n.name AS name, n.description AS description, n.`{index_property}` AS embedding
+    ''')
+
+    def rows():
+        for page in stream_pages(driver, query, page_size, indexLabel=index_label):
+            for row in page:
+                node_labels = row.get('labels')
+                yield {**row, 'label': node_labels[0] if node_labels else 'unknown'}
+
+    start = time.perf_counter()
+    base_path = embedding_store_path(embedding_set)
+    written = write_embedding_store(base_path, rows(), count or 0, {
+        'version': embedding_set['version'],
+        'model': embedding_set['model_id'],
+        'dimension': dimension or embedding_set['dimension'],
+        'property': index_property,
+        'watermark': exported_at - 1,
+    })
+    print(f"Wrote {written} embeddings to {base_path} in {time.perf_counter() - start:.1f}s.")
+
+
+def _writer(driver, batches, errors, embedding_set):
+    batch_n = 1
+    while True:
+        batch = batches.get()
+        if batch is _DONE:
+            return
+        if errors:
+            # Keep draining so the encoder is never blocked on a full queue
+            continue
+        try:
+            import_batch(driver, batch, batch_n, embedding_set)
+        except Exception as e:
+            errors.append(e)
+        batch_n += 1
+
+
+def iter_batches(pages, errors):
+    """Split pages from the reader into encode batches until the reader is done or a stage failed"""
+    while not errors:
+        page = pages.get()
+        if page is _DONE:
+            return
+        for offset in range(0, len(page), batch_size):
+            yield page[offset:offset + batch_size]
+
+
+def encode_serial(pages, batches, errors, embedding_set):
+    """Encode on the main thread while the reader fetches the next page and the writer stores the last batch"""
+    # Initialize the embedding model of the set being built
+    model = load_set_model(embedding_set)
+
+    node_count = 0
+    for nodes in iter_batches(pages, errors):
+        batches.put(encode_batch(model, nodes, embedding_set))
+        node_count += len(nodes)
+    return node_count
+
+
+def encode_parallel(pages, batches, errors, embedding_set, workers):
+    """Shard batches across a process pool, each worker holding its own model; results go to the single writer"""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Encoding with {workers} worker processes, {threads} threads each.")
+
+    node_count = 0
+    # The reader and writer threads are already running: forking now could copy a lock
+    # held by one of them (logging, the Neo4j driver's pool) into a worker and hang it
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(threads, embedding_set),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        # Keep every worker busy with a second batch queued, without reading ahead unboundedly
+        in_flight = deque()
+        for nodes in iter_batches(pages, errors):
+            in_flight.append((pool.submit(_encode_in_worker, nodes), len(nodes)))
+            if len(in_flight) >= 2 * workers:
+                future, count = in_flight.popleft()
+                batches.put(future.result())
+                node_count += count
+
+        while in_flight and not errors:
+            future, count = in_flight.popleft()
+            batches.put(future.result())
+            node_count += count
+        for future, _ in in_flight:
+            future.cancel()
+    return node_count
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Create or update description embeddings of all graph nodes")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-embed every node, even if its description and the model are unchanged")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Encode in N processes, each with its own model (default: 1, in-process)")
+    parser.add_argument("--version", default=embedding_config.get("version"),
+                        help="Embedding set to build, e.g. v2 for a new model next to the live set "
+                             "(default: the live set, embedding.version)")
+    args = parser.parse_args()
+
+    embedding_set = get_embedding_set(args.version)
+    print(f"Building embedding set {embedding_set['version'] or '(unversioned)'} with {embedding_set['model']} "
+          f"into {embedding_set['property']}.")
+
     driver = neo4j.GraphDatabase.driver(uri, auth=auth)
     driver.verify_connectivity()
 
-    # Initialize the sentence transformer model from config
-    model = SentenceTransformer(model_name)
+    pages = queue.Queue(maxsize=QUEUE_SIZE)
+    batches = queue.Queue(maxsize=QUEUE_SIZE)
+    errors = []
+    stats = {'scanned': 0}
 
-    batch_n = 1
-    nodes_with_embeddings = []
-
-    with driver.session(database=db_name) as session:
-        # Find nodes with description property
-        result = session.run(
-            'MATCH (n) WHERE n.description IS NOT NULL RETURN elementId(n) as elementId, n.description AS description, n.name AS name')
-        for record in result:
-            node_id = record.get('elementId')
-            name = record.get('name')
-            description = record.get('description')
-
-            # Create embedding
-            if description is not None:
-                text_to_encode = f"Name: {name or ''}\nDescription: {description}"
-                embedding = model.encode(text_to_encode).tolist()
-                nodes_with_embeddings.append({
-                    'elementId': node_id,
-                    'name': name,
-                    'description': description,
-                    'embedding': embedding
-                })
-
-            # Import when a batch has embeddings ready; flush buffer
-            if len(nodes_with_embeddings) == batch_size:
-                import_batch(driver, nodes_with_embeddings, batch_n)
-                nodes_with_embeddings = []
-                batch_n += 1
-
-        # Flush last batch
-        if nodes_with_embeddings:
-            import_batch(driver, nodes_with_embeddings, batch_n)
+    reader = threading.Thread(target=_reader, args=(driver, pages, errors, stats, embedding_set, args.full),
+                              name="embedding-reader", daemon=True)
+    writer = threading.Thread(target=_writer, args=(driver, batches, errors, embedding_set),
+                              name="embedding-writer", daemon=True)
+
+    start = time.perf_counter()
+    reader.start()
+    writer.start()
+    try:
+        if args.workers > 1:
+            node_count = encode_parallel(pages, batches, errors, embedding_set, args.workers)
+        else:
+            node_count = encode_serial(pages, batches, errors, embedding_set)
+    finally:
+        batches.put(_DONE)
+        writer.join()
+
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - start
+    print(f"Scanned {stats['scanned']} nodes, embedded {node_count} changed nodes in {elapsed:.1f}s "
+          f"({node_count / elapsed if elapsed else 0:.1f} nodes/sec).")
+
+    removed = remove_stale_embeddings(driver, embedding_set)
+    print(f"Removed embeddings of {removed} nodes without a description.")
 
+    # Let running agents drop caches derived from the previous graph state
+    if node_count or removed:
+        bump_graph_version(driver, db_name)
 
+    if embedding_store_config.get("enabled", True):
+        store = load_embedding_store(embedding_store_path(embedding_set))
+        if node_count or removed or store is None or not store_matches(store[1], embedding_set):
+            export_embedding_store(driver, embedding_set)
 
     # Import complete, show counters
+    index_property = embedding_set['property']
     records, _, _ = driver.execute_query(
         Query(
-            'MATCH (n WHERE n.description_embedding IS NOT NULL) RETURN count(*) AS countNodesWithEmbeddings, size(n.description_embedding) AS embeddingSize'),
+            f'MATCH (n WHERE n.`{index_property}` IS NOT NULL) RETURN count(*) AS countNodesWithEmbeddings, size(n.`{index_property}`) AS embeddingSize'),
         database_=db_name
     )
 
@@ -79,12 +333,14 @@ Embedding size: {records[0].get('embeddingSize')}.
     """)
 
 
-def import_batch(driver, nodes_with_embeddings, batch_n):
-    # Add embeddings to nodes
-    update_query = Query('''
+def import_batch(driver, nodes_with_embeddings, batch_n, embedding_set):
+    # Add embeddings to nodes, under the property names of the embedding set
+    update_query = Query(f'''
     UNWIND $nodes AS node
     MATCH (n) WHERE elementId(n) = node.elementId
-    SET n.description_embedding = node.embedding
+    SET n.`{embedding_set['property']}` = node.embedding, n.`{embedding_set['updated_property']}` = timestamp(),
+        n.`{embedding_set['hash_property']}` = node.hash, n.`{embedding_set['model_property']}` = node.model,
+        n:`{index_label}`
     ''')
 
     driver.execute_query(
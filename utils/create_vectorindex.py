@@ -1,9 +1,12 @@
 from dotenv import load_dotenv
 
 load_dotenv()
+import argparse
 import neo4j
 from neo4j import Query
 from utils.utils import load_config
+from data.knowledgegraph import bump_graph_version
+from models.embedding import get_embedding_set
 
 # Database connection credentials
 import os
@@ -17,33 +20,103 @@ auth = (neo4j_config.get("username", ""), password)
 db_name = neo4j_config.get("database", "")
 
 embedding_config = config.get("embedding", {})
-dimension = embedding_config.get("dimension", {})
 
-def create_vector_index():
+# Vector indexes in Neo4j are bound to a single label. The BEV graph spreads its
+# nodes over many labels, so every embedded node also carries a shared label
+# that the index is defined on. Index name, property and dimension depend on the
+# embedding set being indexed, see models.embedding.get_embedding_set().
+vector_index_config = config.get("vector_index", {})
+index_label = vector_index_config.get("label", "Embedded")
+similarity_function = vector_index_config.get("similarity_function", "cosine")
+
+# One additional vector index per BEV node label, named <index_name>_<label>, so a
+# search targeting one node type only ranks nodes of that type
+partition_labels = vector_index_config.get("partition_labels", [])
+
+# Full-text index on the same label for exact identifiers that embeddings rank poorly
+fulltext_index_name = config.get("fulltext_index", {}).get("name", "nodeText")
+
+
+def label_embedded_nodes(driver, index_property):
+    """Add the shared index label to every node that already has an embedding"""
+    # Labels and property keys cannot be parameterized, they come from config.json
+    label_query = Query(f'''
+    MATCH (n) WHERE n.`{index_property}` IS NOT NULL AND NOT n:`{index_label}`
+    CALL {{ WITH n SET n:`{index_label}` }} IN TRANSACTIONS OF 1000 ROWS
+    ''')
+
+    with driver.session(database=db_name) as session:
+        session.run(label_query).consume()
+
+    records, _, _ = driver.execute_query(
+        Query(f'MATCH (n:`{index_label}`) RETURN count(n) AS labelled'),
+        database_=db_name
+    )
+    print(f"Nodes carrying :{index_label}: {records[0].get('labelled')}")
+
+
+def create_vector_index(embedding_set=None):
+    embedding_set = embedding_set or get_embedding_set(embedding_config.get("version"))
+    index_name = embedding_set["index_name"]
+    index_property = embedding_set["property"]
+    dimension = embedding_set["dimension"]
+
     driver = neo4j.GraphDatabase.driver(uri, auth=auth)
     driver.verify_connectivity()
 
-    print("Creating vector index...")
-
     try:
-        # Create vector index with proper parameter passing
-        vector_query = Query('''
-        CREATE VECTOR INDEX nodeDescription
-        FOR (n:node)
-        ON n.description_embedding
-        OPTIONS {indexConfig: {
+        print(f"Labelling embedded nodes with :{index_label}...")
+        label_embedded_nodes(driver, index_property)
+
+        print(f"Creating vector index {index_name} on :{index_label}({index_property})...")
+
+        # Index name, label and property cannot be parameterized, they come from config.json
+        vector_query = Query(f'''
+        CREATE VECTOR INDEX `{index_name}` IF NOT EXISTS
+        FOR (n:`{index_label}`)
+        ON n.`{index_property}`
+        OPTIONS {{indexConfig: {{
             `vector.dimensions`: $dimension,
-            `vector.similarity_function`: 'cosine'
-        }}
+            `vector.similarity_function`: $similarity_function
+        }}}}
         ''')
 
         driver.execute_query(
             vector_query,
-            #parameters={"dimension": dimension},
-            dimension = dimension,
+            dimension=dimension,
+            similarity_function=similarity_function,
             database_=db_name
         )
-        print("Vector index created successfully.")
+
+        for label in partition_labels:
+            print(f"Creating vector index {index_name}_{label} on :{label}({index_property})...")
+            driver.execute_query(Query(f'''
+            CREATE VECTOR INDEX `{index_name}_{label}` IF NOT EXISTS
+            FOR (n:`{label}`)
+            ON n.`{index_property}`
+            OPTIONS {{indexConfig: {{
+                `vector.dimensions`: $dimension,
+                `vector.similarity_function`: $similarity_function
+            }}}}
+            '''), dimension=dimension, similarity_function=similarity_function, database_=db_name)
+
+        print(f"Creating full-text index {fulltext_index_name} and name index on :{index_label}...")
+        driver.execute_query(Query(f'''
+        CREATE FULLTEXT INDEX `{fulltext_index_name}` IF NOT EXISTS
+        FOR (n:`{index_label}`) ON EACH [n.name, n.description]
+        '''), database_=db_name)
+        # Backs the exact-name shortcut in semantic_search
+        driver.execute_query(Query(f'''
+        CREATE INDEX `{index_label}Name` IF NOT EXISTS
+        FOR (n:`{index_label}`) ON (n.name)
+        '''), database_=db_name)
+
+        # Block until the indexes are populated so the first search does not miss them
+        driver.execute_query("CALL db.awaitIndexes(300)", database_=db_name)
+        print("Vector, full-text and name indexes created successfully.")
+
+        # Labels changed, so the cached schema of running agents is stale
+        bump_graph_version(driver, db_name)
 
     except Exception as e:
         print(f"Error creating vector index: {e}")
@@ -53,4 +126,8 @@ def create_vector_index():
 
 
 if __name__ == "__main__":
-    create_vector_index()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create the vector, full-text and name indexes of an embedding set")
+    parser.add_argument("--version", default=embedding_config.get("version"),
+                        help="Embedding set to index (default: the live set, embedding.version)")
+    args = parser.parse_args()
+    create_vector_index(get_embedding_set(args.version))
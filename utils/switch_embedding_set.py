@@ -0,0 +1,128 @@
+from dotenv import load_dotenv
+
+load_dotenv()
+import argparse
+import json
+import os
+import neo4j
+from neo4j import Query
+from utils.utils import load_config
+from data.knowledgegraph import bump_graph_version
+from models.embedding import get_embedding_set
+
+# Database connection credentials
+password = os.getenv("NEO4J_ADMIN")
+
+# Load configuration
+config = load_config()
+neo4j_config = config.get("neo4j", {})
+uri = neo4j_config.get("uri", "")
+auth = (neo4j_config.get("username", ""), password)
+db_name = neo4j_config.get("database", "")
+
+vector_index_config = config.get("vector_index", {})
+partition_labels = vector_index_config.get("partition_labels", [])
+
+CONFIG_PATH = "config.json"
+
+
+def check_embedding_set(driver, embedding_set):
+    """Reasons the embedding set cannot serve searches yet, empty when it is complete"""
+    problems = []
+
+    # The shared index and every per-label index must exist and be fully populated
+    index_names = [embedding_set["index_name"]] + [f"{embedding_set['index_name']}_{label}" for label in partition_labels]
+    records, _, _ = driver.execute_query(
+        "SHOW VECTOR INDEXES YIELD name, state, populationPercent WHERE name IN $names "
+        "RETURN name, state, populationPercent",
+        names=index_names,
+        database_=db_name
+    )
+    indexes = {record.get("name"): record for record in records}
+    for name in index_names:
+        index = indexes.get(name)
+        if index is None:
+            problems.append(f"vector index {name} does not exist")
+        elif index.get("state") != "ONLINE" or index.get("populationPercent") < 100:
+            problems.append(f"vector index {name} is {index.get('state')} at {index.get('populationPercent')}%")
+
+    # Every node with a description must carry an embedding from the set's model
+    records, _, _ = driver.execute_query(
+        Query(f'''
+        MATCH (n) WHERE n.description IS NOT NULL
+        RETURN count(n) AS total,
+               count(CASE WHEN n.`{embedding_set['model_property']}` = $model
+                          AND n.`{embedding_set['property']}` IS NOT NULL THEN 1 END) AS embedded
+        '''),
+        model=embedding_set["model_id"],
+        database_=db_name
+    )
+    total, embedded = records[0].get("total"), records[0].get("embedded")
+    if embedded < total:
+        problems.append(f"only {embedded} of {total} nodes are embedded with {embedding_set['model_id']}")
+
+    return problems
+
+
+def write_config(settings):
+    """Replace config.json in one rename, so readers never see a partially written file"""
+    temp_path = f"{CONFIG_PATH}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as config_file:
+        json.dump(settings, config_file, indent=2, ensure_ascii=False)
+        config_file.write("\n")
+        config_file.flush()
+        os.fsync(config_file.fileno())
+    os.replace(temp_path, CONFIG_PATH)
+
+
+def switch_embedding_set(version, force=False):
+    """
+    Make a fully built embedding set live.
+
+    The old set's properties and indexes are left in place, so switching back is
+    the same single step. Running processes pick up the new set on their next
+    search, see models.embedding.get_live_embedding_set().
+    """
+    settings = load_config()
+    current = settings.get("embedding", {}).get("version")
+    if version == current:
+        print(f"Embedding set {version or '(unversioned)'} is already live.")
+        return True
+
+    embedding_set = get_embedding_set(version, settings)
+
+    driver = neo4j.GraphDatabase.driver(uri, auth=auth)
+    driver.verify_connectivity()
+
+    try:
+        problems = check_embedding_set(driver, embedding_set)
+        if problems:
+            print(f"Embedding set {version or '(unversioned)'} is not complete:")
+            for problem in problems:
+                print(f"  - {problem}")
+            if not force:
+                print("Not switching. Build it with utils/create_embeddings.py and utils/create_vectorindex.py "
+                      "using --version, or pass --force.")
+                return False
+
+        settings.setdefault("embedding", {})["version"] = version
+        write_config(settings)
+
+        # Semantic hits and Cypher cached against the previous set are dropped
+        bump_graph_version(driver, db_name)
+
+        print(f"Embedding set {version or '(unversioned)'} is live (was {current or '(unversioned)'}).")
+        print(f"Switch back with: python -m utils.switch_embedding_set {current or 'none'}")
+        return True
+
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atomically switch the embedding set used by semantic search")
+    parser.add_argument("version", help="Embedding set to make live, 'none' for the unversioned set")
+    parser.add_argument("--force", action="store_true", help="Switch even if the set is incomplete")
+    args = parser.parse_args()
+
+    switch_embedding_set(None if args.version.lower() == "none" else args.version, force=args.force)